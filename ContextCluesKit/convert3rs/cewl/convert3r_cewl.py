@@ -8,10 +8,11 @@ Usage:
 
 import argparse
 import json
+import mmap
+import os
 import sys
-from collections import OrderedDict
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 try:
     import torch
@@ -20,34 +21,164 @@ except ImportError:
     torch = None
     SentenceTransformer = None
 
-DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
 
-def convert_cewl_to_json(input_path: str) -> List[OrderedDict]:
-    words: List[OrderedDict] = []
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB output buffer
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _trim_line(buf, pos, n):
+        """Return the whitespace-trimmed bounds of the line starting at pos and its newline offset."""
+        end = pos
+        while end < n and buf[end] != 10:
+            end += 1
+        s = pos
+        e = end
+        while s < e and (buf[s] == 32 or 9 <= buf[s] <= 13):
+            s += 1
+        while e > s and (buf[e - 1] == 32 or 9 <= buf[e - 1] <= 13):
+            e -= 1
+        return s, e, end
+
+    @njit(cache=True)
+    def _scan_words(buf):
+        """Return start/end offsets and line numbers of each whitespace-trimmed, non-blank line."""
+        n = buf.shape[0]
+        # Count the words first so the offset arrays hold exactly one slot per word
+        count = 0
+        pos = 0
+        while pos < n:
+            s, e, end = _trim_line(buf, pos, n)
+            if e > s:
+                count += 1
+            pos = end + 1
+
+        starts = np.empty(count, np.int64)
+        ends = np.empty(count, np.int64)
+        line_nums = np.empty(count, np.int64)
+        i = 0
+        line_num = 1
+        pos = 0
+        while pos < n:
+            s, e, end = _trim_line(buf, pos, n)
+            if e > s:
+                starts[i] = s
+                ends[i] = e
+                line_nums[i] = line_num
+                i += 1
+            line_num += 1
+            pos = end + 1
+        return starts, ends, line_nums
+else:
+    _scan_words = None
+
+
+def iter_mmap_lines(input_path: str) -> Iterator[bytes]:
+    """Yield raw lines from a memory-mapped file, splitting with mmap.find (memchr)."""
+    with open(input_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = 0
+            while pos < size:
+                nl = mm.find(b"\n", pos)
+                if nl == -1:
+                    nl = size
+                yield mm[pos:nl]
+                pos = nl + 1
+
+
+def iter_words(input_path: str) -> Iterator[Tuple[int, str]]:
+    """Yield (line_number, word) for every non-blank line, using the Numba scanner when available."""
+    if _scan_words is None:
+        for line_num, line in enumerate(iter_mmap_lines(input_path), 1):
+            word = line.decode("utf-8").strip()
+            if word:
+                yield line_num, word
+        return
+
+    with open(input_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            buf = np.frombuffer(mm, dtype=np.uint8)
+            starts, ends, line_nums = _scan_words(buf)
+            # The array view has to go before the mmap can be closed
+            del buf
+            for start, end, line_num in zip(starts, ends, line_nums):
+                word = mm[start:end].decode("utf-8").strip()
+                if word:
+                    yield int(line_num), word
+
+
+def iter_records(input_path: str) -> Iterator[Dict[str, Any]]:
     word_id = 1
 
+    for line_num, word in iter_words(input_path):
+        yield {
+            "id": word_id,
+            "word": word,
+            "length": len(word),
+            "lowercase": word.lower(),
+            "line_number": line_num,
+        }
+        word_id += 1
+
+
+def convert_cewl_to_json(input_path: str) -> List[Dict[str, Any]]:
     print(f"📖 Reading CeWL wordlist from {input_path}...")
+    words = list(iter_records(input_path))
+    print(f"✓ Processed {len(words)} words")
+    return words
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        for line_num, line in enumerate(f, 1):
-            word = line.strip()
-            if not word:
-                continue
 
-            record = OrderedDict([
-                ("id", word_id),
-                ("word", word),
-                ("length", len(word)),
-                ("lowercase", word.lower()),
-                ("line_number", line_num)
-            ])
+def dump_record(record: Dict[str, Any], pretty: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_INDENT_2 if pretty else None)
+    return json.dumps(record, indent=2 if pretty else None, ensure_ascii=False).encode("utf-8")
 
-            words.append(record)
-            word_id += 1
 
-    print(f"✓ Processed {len(words)} words")
-    return words
+def write_records(records: Iterable[Dict[str, Any]], output_file: str, ndjson: bool = False,
+                  pretty: bool = False) -> Dict[str, Any]:
+    """Write records as a JSON array (or NDJSON) one at a time, collecting stats in the same pass."""
+    stats: Dict[str, Any] = {"count": 0, "total_length": 0, "min": None, "max": None, "sample": []}
+
+    with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        if not ndjson:
+            f.write(b"[\n")
+        for record in records:
+            if ndjson:
+                f.write(dump_record(record))
+                f.write(b"\n")
+            else:
+                if stats["count"]:
+                    f.write(b",\n")
+                f.write(dump_record(record, pretty=pretty))
+
+            length = record["length"]
+            stats["count"] += 1
+            stats["total_length"] += length
+            stats["min"] = length if stats["min"] is None else min(stats["min"], length)
+            stats["max"] = length if stats["max"] is None else max(stats["max"], length)
+            if len(stats["sample"]) < 5:
+                stats["sample"].append(record)
+        if not ndjson:
+            f.write(b"\n]\n")
+
+    return stats
 
 
 def build_embeddings(texts: List[str], model_name: str = DEFAULT_MODEL):
@@ -74,34 +205,36 @@ def main() -> None:
     parser.add_argument("input_file", help="CeWL wordlist text file")
     parser.add_argument("-o", "--output-file", dest="output_file", help="Output JSON file")
     parser.add_argument("--embed", action="store_true", help="Add sentence-transformer embeddings to each record")
+    parser.add_argument("--ndjson", action="store_true", help="Write one JSON object per line instead of a JSON array")
+    parser.add_argument("--pretty", action="store_true", help="Indent the JSON output for readability")
 
     args = parser.parse_args()
 
     try:
-        records = convert_cewl_to_json(args.input_file)
+        output_file = args.output_file or str(Path(args.input_file).with_suffix(".json"))
 
         if args.embed:
+            records = convert_cewl_to_json(args.input_file)
             print("Generating embeddings...")
             texts = [r["word"] for r in records]
             embeds = build_embeddings(texts)
             for r, emb in zip(records, embeds):
                 r["embed"] = emb
             print("Embeddings generated")
+        else:
+            print(f"📖 Streaming CeWL wordlist from {args.input_file}...")
+            records = iter_records(args.input_file)
 
-        output_file = args.output_file or str(Path(args.input_file).with_suffix(".json"))
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(records, f, indent=2, ensure_ascii=False)
+        stats = write_records(records, output_file, ndjson=args.ndjson, pretty=args.pretty)
 
-        print(f"✅ Saved {len(records)} words to {output_file}")
+        print(f"✅ Saved {stats['count']} words to {output_file}")
 
-        lengths = [r["length"] for r in records]
-        print(f"📊 Stats: avg={sum(lengths)/len(lengths):.1f} chars, "
-              f"min={min(lengths)}, max={max(lengths)}")
+        if stats["count"]:
+            print(f"📊 Stats: avg={stats['total_length']/stats['count']:.1f} chars, "
+                  f"min={stats['min']}, max={stats['max']}")
 
-        if records:
             print("\n📋 Sample:")
-            for r in records[:5]:
+            for r in stats["sample"]:
                 print(f"  ID={r['id']:3d} | {r['word']:<15} | len={r['length']}")
 
     except FileNotFoundError:
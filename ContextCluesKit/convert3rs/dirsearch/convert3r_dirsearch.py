@@ -9,9 +9,8 @@ import argparse
 import json
 import re
 import sys
-from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List
 
 try:
     import torch
@@ -20,7 +19,13 @@ except ImportError:
     torch = None
     SentenceTransformer = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB output buffer
 
 LINE_RE = re.compile(
     r"""
@@ -29,37 +34,31 @@ LINE_RE = re.compile(
     \s+
     (?P<size>\S+)
     \s+
-    (?P<url>\S+)
-    (?:\s*->\s*REDIRECTS\s+TO:\s*(?P<redirect>\S+))?
+    (?:\[(?P<url_text>[^\]\s]+)\](?:\((?P<url_link>[^)\s]+)\))?\S*|(?P<url>\S+))
+    (?:\s*->\s*REDIRECTS\s+TO:\s*
+        (?:\[(?P<redirect_text>[^\]\s]+)\](?:\((?P<redirect_link>[^)\s]+)\))?\S*|(?P<redirect>\S+))
+    )?
     """,
     re.VERBOSE,
 )
 
 
-def clean_markdown_url(raw: str) -> str:
-    m = re.match(r'\[([^\]]+)\]\(([^)]+)\)', raw)
-    if m:
-        return m.group(2)
-    m2 = re.match(r'\[([^\]]+)\]', raw)
-    if m2:
-        return m2.group(1)
-    return raw
-
-
 def parse_dirsearch_line(line: str) -> Dict[str, Any] | None:
     match = LINE_RE.match(line)
     if not match:
         return None
 
+    # Markdown links ([text](url)) resolve to the url, bare [text] to the text
+    g = match.group
     return {
-        "status": int(match.group("status")),
-        "size": match.group("size"),
-        "url": clean_markdown_url(match.group("url")),
-        "redirect_to": clean_markdown_url(match.group("redirect")) if match.group("redirect") else None,
+        "status": int(g("status")),
+        "size": g("size"),
+        "url": g("url_link") or g("url_text") or g("url"),
+        "redirect_to": g("redirect_link") or g("redirect_text") or g("redirect"),
     }
 
 
-def convert_dirsearch_to_json(input_path: str) -> List[OrderedDict]:
+def convert_dirsearch_to_json(input_path: str) -> List[Dict[str, Any]]:
     results = []
     current_id = 1
 
@@ -71,15 +70,13 @@ def convert_dirsearch_to_json(input_path: str) -> List[OrderedDict]:
 
             parsed = parse_dirsearch_line(line)
             if parsed:
-                ordered = OrderedDict([("id", current_id)])
-                ordered.update(parsed)
-                results.append(ordered)
+                results.append({"id": current_id, **parsed})
                 current_id += 1
 
     return results
 
 
-def build_embeddings(records: List[OrderedDict], model_name: str = DEFAULT_MODEL):
+def build_embeddings(records: List[Dict[str, Any]], model_name: str = DEFAULT_MODEL):
     if torch is None or SentenceTransformer is None:
         raise ImportError("Missing dependencies. Install with: pip install sentence-transformers torch")
 
@@ -97,6 +94,26 @@ def build_embeddings(records: List[OrderedDict], model_name: str = DEFAULT_MODEL
     return embeddings.tolist()
 
 
+def write_json(obj: Any, output_file: str, pretty: bool = False) -> None:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(obj, option=option))
+        return
+    with open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        json.dump(obj, f, indent=2 if pretty else None, ensure_ascii=False)
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], output_file: str) -> None:
+    with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        for record in records:
+            if orjson is not None:
+                f.write(orjson.dumps(record))
+            else:
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+            f.write(b"\n")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         prog="convert3r_dirsearch.py",
@@ -105,6 +122,8 @@ def main() -> None:
     parser.add_argument("input_file", help="Dirsearch text file")
     parser.add_argument("-o", "--output-file", dest="output_file", help="Output JSON file")
     parser.add_argument("--embed", action="store_true", help="Add sentence-transformer embeddings to each record")
+    parser.add_argument("--ndjson", action="store_true", help="Write one JSON object per line instead of a JSON array")
+    parser.add_argument("--pretty", action="store_true", help="Indent the JSON output for readability")
 
     args = parser.parse_args()
 
@@ -119,8 +138,10 @@ def main() -> None:
 
         output_file = args.output_file or str(Path(args.input_file).with_suffix(".json"))
 
-        with open(output_file, "w", encoding="utf-8") as out:
-            json.dump(records, out, indent=2, ensure_ascii=False)
+        if args.ndjson:
+            write_ndjson(records, output_file)
+        else:
+            write_json(records, output_file, pretty=args.pretty)
 
         print(f"✓ Converted {len(records)} entries → {output_file}")
         if records:
@@ -10,7 +10,7 @@ import json
 import re
 import sys
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List
 
 try:
     import torch
@@ -19,7 +19,13 @@ except ImportError:
     torch = None
     SentenceTransformer = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB output buffer
 
 
 def is_valid_ipv4(ip: str) -> bool:
@@ -116,6 +122,26 @@ def build_embeddings(records: List[Dict[str, Any]], model_name: str = DEFAULT_MO
     return embeddings.tolist()
 
 
+def write_json(obj: Any, output_file: str, pretty: bool = False) -> None:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(obj, option=option))
+        return
+    with open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        json.dump(obj, f, indent=2 if pretty else None, ensure_ascii=False)
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], output_file: str) -> None:
+    with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        for record in records:
+            if orjson is not None:
+                f.write(orjson.dumps(record))
+            else:
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+            f.write(b"\n")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         prog="convert3r_dnsmap.py",
@@ -124,6 +150,8 @@ def main() -> None:
     parser.add_argument("input_file", help="dnsmap text file")
     parser.add_argument("-o", "--output-file", dest="output_file", help="Output JSON file")
     parser.add_argument("--embed", action="store_true", help="Add sentence-transformer embeddings to each record")
+    parser.add_argument("--ndjson", action="store_true", help="Write one JSON object per line instead of a JSON array")
+    parser.add_argument("--pretty", action="store_true", help="Indent the JSON output for readability")
 
     args = parser.parse_args()
 
@@ -138,8 +166,10 @@ def main() -> None:
 
         output_file = args.output_file or str(Path(args.input_file).with_suffix(".json"))
 
-        with open(output_file, "w", encoding="utf-8") as out:
-            json.dump(records, out, indent=2, ensure_ascii=False)
+        if args.ndjson:
+            write_ndjson(records, output_file)
+        else:
+            write_json(records, output_file, pretty=args.pretty)
 
         print(f"✓ Converted {len(records)} entries → {output_file}")
         if records:
@@ -15,6 +15,7 @@ import csv
 import json
 import os
 import re
+from itertools import chain
 
 # Optional import — handled gracefully if missing
 try:
@@ -28,6 +29,20 @@ try:
 except ImportError:
     torch = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pac
+except ImportError:
+    pa = None
+    pac = None
+
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB output buffer
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -40,6 +55,11 @@ def parse_args():
         action="store_true",
         help="Enable sentence-transformer embedding of 'name' + 'address' fields"
     )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Write scan_info on the first line, then one record per line (NDJSON)"
+    )
     return parser.parse_args()
 
 
@@ -88,7 +108,43 @@ def add_embeddings(records: list, model: "SentenceTransformer") -> None:
         raise RuntimeError(f"Failed to generate embeddings: {e}") from e
 
 
-def csv_to_dns_json(csv_file: str, json_file: str, embed: bool = False) -> None:
+def write_json(obj, output_file: str) -> None:
+    """Write the records as one indented JSON document."""
+    if orjson is not None:
+        with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def write_ndjson(records, output_file):
+    """Write the records as NDJSON, one per line."""
+    with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        for record in records:
+            if orjson is not None:
+                f.write(orjson.dumps(record))
+            else:
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+            f.write(b"\n")
+
+
+def read_rows_arrow(csv_file: str, num_columns: int):
+    """Read the data rows (after the header) with pyarrow's C++ CSV parser, column-wise."""
+    table = pac.read_csv(
+        csv_file,
+        read_options=pac.ReadOptions(skip_rows=1, autogenerate_column_names=True),
+        convert_options=pac.ConvertOptions(
+            column_types={f"f{i}": pa.string() for i in range(num_columns)},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    columns = [table.column(i).to_pylist() for i in range(table.num_columns)]
+    return map(list, zip(*columns))
+
+
+def csv_to_dns_json(csv_file: str, json_file: str, embed: bool = False, ndjson: bool = False) -> None:
     """Convert DNS CSV to structured JSON with optional embeddings."""
     # Validate input file
     if not os.path.exists(csv_file):
@@ -114,11 +170,20 @@ def csv_to_dns_json(csv_file: str, json_file: str, embed: bool = False) -> None:
 
             print(f"📋 Headers found: {header}")
 
+            # Prefer the pyarrow reader; ragged or empty files fall back to csv.reader
+            rows = reader
+            if pac is not None:
+                try:
+                    rows = read_rows_arrow(csv_file, len(header))
+                except pa.ArrowInvalid:
+                    pass
+
             # Process each row
-            for row in reader:
+            len_header = len(header)
+            for row in rows:
                 # Pad short rows with empty strings (defensive)
-                while len(row) < len(header):
-                    row.append('')
+                if len(row) < len_header:
+                    row += [''] * (len_header - len(row))
 
                 record = {
                     "id": id_counter,
@@ -169,8 +234,10 @@ def csv_to_dns_json(csv_file: str, json_file: str, embed: bool = False) -> None:
 
     # Write JSON safely
     try:
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        if ndjson:
+            write_ndjson(chain([{"scan_info": output["scan_info"]}], records), json_file)
+        else:
+            write_json(output, json_file)
         print(f"✅ Converted {len(records)} DNS records from '{csv_file}'")
         print(f"📄 Saved to: {json_file}")
     except PermissionError:
@@ -181,7 +248,7 @@ def csv_to_dns_json(csv_file: str, json_file: str, embed: bool = False) -> None:
 
 def main():
     args = parse_args()
-    csv_to_dns_json(args.input_csv, args.output_json, embed=args.embed)
+    csv_to_dns_json(args.input_csv, args.output_json, embed=args.embed, ndjson=args.ndjson)
 
 
 if __name__ == "__main__":
@@ -9,8 +9,10 @@ import argparse
 import json
 import os
 import re
+import sys
+from itertools import chain
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional
 
 try:
     import torch
@@ -19,7 +21,13 @@ except ImportError:
     torch = None
     SentenceTransformer = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB output buffer
 DEFAULT_VECTOR_SIZE = 384
 
 
@@ -55,7 +63,26 @@ def parse_nikto_line(line: str) -> Dict[str, Any] | None:
     }
 
 
-def nikto_txt_to_json(txt_file: str, output_file: str, embed: bool = False):
+def write_json(obj: Any, output_file: str) -> None:
+    if orjson is not None:
+        with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], output_file: str) -> None:
+    with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        for record in records:
+            if orjson is not None:
+                f.write(orjson.dumps(record))
+            else:
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+            f.write(b"\n")
+
+
+def nikto_txt_to_json(txt_file: str, output_file: str, embed: bool = False, ndjson: bool = False):
     if not os.path.exists(txt_file):
         raise FileNotFoundError(f"❌ Text file not found: {txt_file}")
 
@@ -92,8 +119,11 @@ def nikto_txt_to_json(txt_file: str, output_file: str, embed: bool = False):
         "entries": entries
     }
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    if ndjson:
+        header = {"vector_size": DEFAULT_VECTOR_SIZE, "total_entries": len(entries)}
+        write_ndjson(chain([header], entries), output_file)
+    else:
+        write_json(output_data, output_file)
 
     print(f"✅ Converted to JSON: {output_file}")
 
@@ -132,12 +162,13 @@ def main():
     parser.add_argument("input_file", help="Path to nikto text output file")
     parser.add_argument("-o", "--output-file", dest="output_file", help="Output JSON file")
     parser.add_argument("--embed", action="store_true", help="Add sentence-transformer embeddings to each record")
+    parser.add_argument("--ndjson", action="store_true", help="Write a header line, then one entry per line (NDJSON)")
 
     args = parser.parse_args()
 
     try:
         output_file = args.output_file or str(Path(args.input_file).with_suffix(".json"))
-        nikto_txt_to_json(args.input_file, output_file, embed=args.embed)
+        nikto_txt_to_json(args.input_file, output_file, embed=args.embed, ndjson=args.ndjson)
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
         sys.exit(1)
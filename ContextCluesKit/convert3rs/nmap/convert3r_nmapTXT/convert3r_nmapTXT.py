@@ -10,7 +10,8 @@ import json
 import os
 import re
 import sys
-from typing import List, Dict, Any, Optional
+from itertools import chain
+from typing import Iterable, Dict, Any, Optional
 
 try:
     import torch
@@ -19,7 +20,26 @@ except ImportError:
     torch = None
     SentenceTransformer = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB output buffer
+
+_RE_NMAP_VER = re.compile(r"Starting Nmap ([\d.]+)")
+_RE_HOST_REPORT = re.compile(r"Nmap scan report for\s+(.+?)\s*\((.+?)\)")
+_RE_LATENCY = re.compile(r"Host is up \(([^)]+)s latency\)")
+_RE_SCAN_TIMING = re.compile(r"Scanned at (.+?) for (\d+)s")
+_RE_PORT_ROW = re.compile(r"^(\d+)/([a-z]+)\s+(open|closed|filtered)\s+(.+?)(?:\s+(.+))?$")
+_RE_HTTP_ENUM = re.compile(r"Found a valid page!\s+(.+?):\s*(.+)")
+_RE_HTTP_HDR = re.compile(r"_http-server-header:\s*(.+)")
+_RE_DONE = re.compile(
+    r"Nmap done:\s+(\d+)\s+IP address.*\((\d+)\s+hosts up\).*scanned in\s+([\d.]+)\s+seconds?"
+)
+
+PORT_FIELDS = ("port", "protocol", "state", "service", "version", "scripts")
 
 
 def safe_dict_get(obj, key, default=None):
@@ -35,16 +55,17 @@ def safe_list(obj):
 
 
 class RobustNmapParser:
-    def __init__(self):
+    def __init__(self, include_raw: bool = False):
+        self.include_raw = include_raw
         self.results: Dict[str, Any] = {
             "scan_info": {},
             "hosts": [],
             "progress_stats": [],
             "nse_scripts": [],
-            "service_fingerprints": [],
-            "raw_lines": []
+            "service_fingerprints": []
         }
-        self.lines: List[str] = []
+        if include_raw:
+            self.results["raw_lines"] = []
         self.current_host: Optional[Dict[str, Any]] = None
         self.current_port: Optional[Dict[str, Any]] = None
         self.host_id_counter = 0
@@ -52,35 +73,56 @@ class RobustNmapParser:
     def parse(self, input_file: str) -> Dict[str, Any]:
         try:
             with open(input_file, "r", encoding="utf-8") as f:
-                self.lines = f.readlines()
+                self._parse_all_lines(f)
         except OSError as e:
             raise RuntimeError(f"Failed to read {input_file}: {e}")
 
-        self._parse_all_lines()
-        self._finalize_results()
         return self.results
 
-    def _parse_all_lines(self):
-        for i, line in enumerate(self.lines):
+    def _parse_all_lines(self, lines: Iterable[str]):
+        for i, line in enumerate(lines, 1):
             line_stripped = line.strip()
-            self.results["raw_lines"].append({"line_num": i + 1, "content": line_stripped})
-            self._parse_scan_header(line_stripped)
-            self._parse_progress_stats(line_stripped)
-            self._parse_nse_start_finish(line_stripped)
-            self._parse_host_report(line_stripped)
-            self._parse_host_metadata(line_stripped)
-            self._parse_port_table(line_stripped)
-            self._parse_port_scripts(line_stripped)
-            self._parse_service_fingerprints(line_stripped)
+            if self.include_raw:
+                self.results["raw_lines"].append({"line_num": i, "content": line_stripped})
+            self._parse_line(line_stripped)
+
+    def _parse_line(self, line: str):
+        """Route a line to the parsers that can match it using cheap prefix checks."""
+        # Host and port rows go first so the line is recorded under the section it opens.
+        if line.startswith("Nmap scan report for"):
+            self._parse_host_report(line)
+        elif line[:1].isdigit():
+            self._parse_port_table(line)
+
+        if self.include_raw and self.current_host:
+            self.current_host["raw_section"].append(line)
+            if self.current_port:
+                self.current_port["script_lines"].append(line)
+
+        if line.startswith("|"):
+            self._parse_port_scripts(line)
+        elif line.startswith("Starting Nmap"):
+            self._parse_scan_header(line)
+        elif line.startswith(("Stats:", "NSE:")):
+            self._parse_progress_stats(line)
+        elif line.startswith(("rDNS record for", "Host is up", "Scanned at")):
+            self._parse_host_metadata(line)
+        elif "NEXT SERVICE FINGERPRINT" in line:
+            self._parse_service_fingerprints(line)
+        elif line.startswith("Nmap done:"):
+            self._parse_scan_done(line)
+
+        if "against" in line:
+            self._parse_nse_start_finish(line)
 
     def _parse_scan_header(self, line: str):
         if "Starting Nmap" in line:
-            version_match = re.search(r"Starting Nmap ([\d.]+)", line)
-            time_match = re.search(r"at (.+?)$", line)
+            version_match = _RE_NMAP_VER.search(line)
             if version_match:
                 self.results["scan_info"]["nmap_version"] = version_match.group(1)
-            if time_match:
-                self.results["scan_info"]["start_time"] = time_match.group(1)
+            _, sep, start_time = line.rpartition(" at ")
+            if sep and start_time:
+                self.results["scan_info"]["start_time"] = start_time
 
     def _parse_progress_stats(self, line: str):
         if line.startswith("Stats:"):
@@ -99,7 +141,7 @@ class RobustNmapParser:
                 self.results["nse_scripts"].append({"type": "finish", "script": parts[1], "target": line})
 
     def _parse_host_report(self, line: str):
-        host_match = re.search(r"Nmap scan report for\s+(.+?)\s*\((.+?)\)", line)
+        host_match = _RE_HOST_REPORT.search(line)
         if host_match and not self.current_host:
             self.host_id_counter += 1
             self.current_host = {
@@ -108,22 +150,24 @@ class RobustNmapParser:
                 "ip": host_match.group(2).strip(),
                 "ports": [],
                 "metadata": {},
-                "scripts": {},
-                "raw_section": []
+                "scripts": {}
             }
+            if self.include_raw:
+                self.current_host["raw_section"] = []
             self.results["hosts"].append(self.current_host)
 
     def _parse_host_metadata(self, line: str):
         if not self.current_host:
             return
-        self.current_host["raw_section"].append(line)
-        rdns_match = re.search(r"rDNS record for \S+:\s*(.+)", line)
-        if rdns_match:
-            self.current_host["metadata"]["rdns"] = rdns_match.group(1).strip()
-        latency_match = re.search(r"Host is up \(([^)]+)s latency\)", line)
+        if line.startswith("rDNS record for"):
+            rdns = line.partition(": ")[2].strip()
+            if rdns:
+                self.current_host["metadata"]["rdns"] = rdns
+            return
+        latency_match = _RE_LATENCY.search(line)
         if latency_match:
             self.current_host["metadata"]["latency"] = latency_match.group(1) + "s"
-        scan_match = re.search(r"Scanned at (.+?) for (\d+)s", line)
+        scan_match = _RE_SCAN_TIMING.search(line)
         if scan_match:
             self.current_host["metadata"]["scan_start"] = scan_match.group(1)
             self.current_host["metadata"]["scan_duration"] = scan_match.group(2) + "s"
@@ -131,7 +175,7 @@ class RobustNmapParser:
     def _parse_port_table(self, line: str):
         if not self.current_host:
             return
-        port_match = re.match(r"^(\d+)/([a-z]+)\s+(open|closed|filtered)\s+(.+?)(?:\s+(.+))?$", line)
+        port_match = _RE_PORT_ROW.match(line)
         if port_match:
             version_part = port_match.group(5).strip() if port_match.group(5) else ""
             self.current_port = {
@@ -140,41 +184,42 @@ class RobustNmapParser:
                 "state": port_match.group(3),
                 "service": port_match.group(4).strip(),
                 "version": version_part,
-                "scripts": {},
-                "raw_output": line,
-                "script_lines": []
+                "scripts": {}
             }
+            if self.include_raw:
+                self.current_port["raw_output"] = line
+                self.current_port["script_lines"] = []
             self.current_host["ports"].append(self.current_port)
 
     def _parse_port_scripts(self, line: str):
         if not self.current_host or not self.current_port:
             return
-        self.current_port["script_lines"].append(line)
 
-        enum_match = re.search(r"Found a valid page!\s+(.+?):\s*(.+)", line)
+        scripts = self.current_port["scripts"]
+
+        enum_match = _RE_HTTP_ENUM.search(line)
         if enum_match:
-            path = enum_match.group(1).strip()
-            title = enum_match.group(2).strip()
-            self.current_port["scripts"].setdefault("http-enum", {"paths": []})
-            self.current_port["scripts"]["http-enum"]["paths"].append({"path": path, "title": title})
+            http_enum = scripts.get("http-enum")
+            if not isinstance(http_enum, dict):
+                # Also replaces the [] placeholder left by a "| http-enum:" header line
+                http_enum = scripts["http-enum"] = {"paths": []}
+            http_enum["paths"].append({"path": enum_match.group(1).strip(), "title": enum_match.group(2).strip()})
 
-        header_match = re.search(r"_http-server-header:\s*(.+)", line)
+        header_match = _RE_HTTP_HDR.search(line)
         if header_match:
-            self.current_port["scripts"]["http-server-header"] = header_match.group(1).strip()
+            scripts["http-server-header"] = header_match.group(1).strip()
 
         if line.startswith("|") and ":" in line and not line.startswith("|_"):
             script_name = line.split(":", 1)[0].replace("|", "").strip()
-            self.current_port["scripts"].setdefault(script_name, [])
+            if script_name not in scripts:
+                scripts[script_name] = []
 
     def _parse_service_fingerprints(self, line: str):
         if "NEXT SERVICE FINGERPRINT" in line:
             self.results["service_fingerprints"].append({"type": "service_fingerprint", "content": line})
 
-    def _finalize_results(self):
-        done_match = re.search(
-            r"Nmap done:\s+(\d+)\s+IP address.*\((\d+)\s+hosts up\).*scanned in\s+([\d.]+)\s+seconds?",
-            " ".join(self.lines)
-        )
+    def _parse_scan_done(self, line: str):
+        done_match = _RE_DONE.search(line)
         if done_match:
             self.results["scan_info"].update({
                 "total_hosts": int(done_match.group(1)),
@@ -218,8 +263,38 @@ class RobustNmapParser:
         print(f"✅ Generated embeddings for {total_items} textual items.", file=sys.stderr)
 
 
-def parse_file(input_file: str, output_file: str, embed: bool = False):
-    parser_obj = RobustNmapParser()
+def to_columnar(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of results with each host's ports as parallel per-field arrays."""
+    hosts = []
+    for host in results["hosts"]:
+        ports = host["ports"]
+        fields = list(ports[0]) if ports else list(PORT_FIELDS)
+        hosts.append({**host, "ports": {field: [p.get(field) for p in ports] for field in fields}})
+    return {**results, "hosts": hosts}
+
+
+def write_json(obj: Any, output_file: str) -> None:
+    if orjson is not None:
+        with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], output_file: str) -> None:
+    with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        for record in records:
+            if orjson is not None:
+                f.write(orjson.dumps(record))
+            else:
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+            f.write(b"\n")
+
+
+def parse_file(input_file: str, output_file: str, embed: bool = False, include_raw: bool = False,
+               ndjson: bool = False, columnar: bool = False):
+    parser_obj = RobustNmapParser(include_raw=include_raw)
     data = parser_obj.parse(input_file)
 
     if embed:
@@ -228,8 +303,12 @@ def parse_file(input_file: str, output_file: str, embed: bool = False):
         except Exception as e:
             print(f"⚠️ Embedding failed: {e}", file=sys.stderr)
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    output = to_columnar(data) if columnar else data
+    if ndjson:
+        header = {key: value for key, value in output.items() if key != "hosts"}
+        write_ndjson(chain([header], output["hosts"]), output_file)
+    else:
+        write_json(output, output_file)
 
 
 def main():
@@ -241,6 +320,12 @@ def main():
     parser.add_argument("-o", "--output-file", dest="output_file", help="Output JSON file")
     parser.add_argument("--embed", action="store_true",
                         help="Generate SentenceTransformer embeddings for host info and HTTP paths")
+    parser.add_argument("--include-raw", action="store_true",
+                        help="Keep the raw input lines (raw_lines, raw_section, script_lines) in the output")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Write scan-level data on the first line, then one host per line (NDJSON)")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Emit each host's ports as per-field arrays (port, protocol, state, ...)")
 
     args = parser.parse_args()
 
@@ -250,7 +335,8 @@ def main():
 
     try:
         output_file = args.output_file or os.path.splitext(args.input_file)[0] + ".json"
-        parse_file(args.input_file, output_file, embed=args.embed)
+        parse_file(args.input_file, output_file, embed=args.embed, include_raw=args.include_raw,
+                   ndjson=args.ndjson, columnar=args.columnar)
         print(f"✅ Successfully parsed → {output_file}", file=sys.stderr)
     except Exception as e:
         print(f"❌ Fatal error: {e}", file=sys.stderr)
@@ -1,9 +1,51 @@
 import re
 import json
+import mmap
+import os
 import argparse
 import sys
 
-def parse_nuclei_logs(input_path, output_path):
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB output buffer
+
+def write_json(obj, output_path, pretty=False):
+    if orjson is not None:
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as out_f:
+            out_f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None))
+        return
+    with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as out_f:
+        json.dump(obj, out_f, indent=2 if pretty else None, ensure_ascii=False,
+                  separators=None if pretty else (',', ':'))
+
+def write_ndjson(records, output_path):
+    with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        for record in records:
+            if orjson is not None:
+                f.write(orjson.dumps(record))
+            else:
+                f.write(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+            f.write(b'\n')
+
+def iter_lines(input_path):
+    """Yield decoded lines from a memory-mapped file, splitting with mmap.find (memchr)."""
+    with open(input_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = 0
+            while pos < size:
+                nl = mm.find(b'\n', pos)
+                if nl == -1:
+                    nl = size
+                yield mm[pos:nl].decode('utf-8')
+                pos = nl + 1
+
+def parse_nuclei_logs(input_path, output_path, ndjson=False, pretty=False):
     parsed_results = []
     entry_id = 1
 
@@ -14,44 +56,45 @@ def parse_nuclei_logs(input_path, output_path):
     status_pattern = re.compile(r'^\[(?P<type>INF|WRN)\]\s(?P<message>.*)')
 
     try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                entry = {"id": entry_id}
-                
-                # Check for vulnerability/tech findings
-                finding_match = finding_pattern.match(line)
-                if finding_match:
-                    entry.update({
-                        "entry_type": "finding",
-                        "template": finding_match.group('template'),
-                        "protocol": finding_match.group('protocol'),
-                        "severity": finding_match.group('severity'),
-                        "target": finding_match.group('target'),
-                        "extra_info": finding_match.group('meta').strip() if finding_match.group('meta') else None
-                    })
-                    parsed_results.append(entry)
-                    entry_id += 1
-                    continue
+        for line in iter_lines(input_path):
+            line = line.strip()
+            if not line:
+                continue
+            
+            entry = {"id": entry_id}
+            
+            # Check for vulnerability/tech findings
+            finding_match = finding_pattern.match(line)
+            if finding_match:
+                entry.update({
+                    "entry_type": "finding",
+                    "template": finding_match.group('template'),
+                    "protocol": finding_match.group('protocol'),
+                    "severity": finding_match.group('severity'),
+                    "target": finding_match.group('target'),
+                    "extra_info": finding_match.group('meta').strip() if finding_match.group('meta') else None
+                })
+                parsed_results.append(entry)
+                entry_id += 1
+                continue
 
-                # Check for INF/WRN log messages
-                status_match = status_pattern.match(line)
-                if status_match:
-                    entry.update({
-                        "entry_type": "log",
-                        "log_level": "info" if status_match.group('type') == "INF" else "warning",
-                        "message": status_match.group('message')
-                    })
-                    parsed_results.append(entry)
-                    entry_id += 1
-                    continue
+            # Check for INF/WRN log messages
+            status_match = status_pattern.match(line)
+            if status_match:
+                entry.update({
+                    "entry_type": "log",
+                    "log_level": "info" if status_match.group('type') == "INF" else "warning",
+                    "message": status_match.group('message')
+                })
+                parsed_results.append(entry)
+                entry_id += 1
+                continue
 
         # Save to JSON
-        with open(output_path, 'w', encoding='utf-8') as out_f:
-            json.dump(parsed_results, out_f, indent=4)
+        if ndjson:
+            write_ndjson(parsed_results, output_path)
+        else:
+            write_json(parsed_results, output_path, pretty=pretty)
         
         print(f"[+] Successfully parsed {len(parsed_results)} entries.")
         print(f"[+] Output saved to: {output_path}")
@@ -69,10 +112,12 @@ def main():
     # Positional arguments or flagged arguments
     parser.add_argument("-i", "--input", required=True, help="Path to the raw Nuclei log file (.txt)")
     parser.add_argument("-o", "--output", required=True, help="Path for the resulting JSON file (.json)")
+    parser.add_argument("--ndjson", action="store_true", help="Write one JSON object per line instead of a JSON array")
+    parser.add_argument("--pretty", action="store_true", help="Indent the JSON output for readability")
 
     args = parser.parse_args()
 
-    parse_nuclei_logs(args.input, args.output)
+    parse_nuclei_logs(args.input, args.output, ndjson=args.ndjson, pretty=args.pretty)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,7 +9,6 @@ import argparse
 import json
 import os
 import sys
-from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
@@ -110,7 +109,7 @@ def sanitize_value(val):
         return None
     return str(val)
 
-def process_input(input_path: str, model) -> List[OrderedDict]:
+def process_input(input_path: str, model) -> List[Dict[str, Any]]:
     """Process JSONL input, add embeddings if model available"""
     results = []
     skipped_lines = 0
@@ -135,8 +134,7 @@ def process_input(input_path: str, model) -> List[OrderedDict]:
                 continue
 
             # Create new record with sequential ID
-            new_record = OrderedDict()
-            new_record["id"] = next_id
+            new_record = {"id": next_id}
 
             # Copy all original fields (skip existing embeddings)
             for key, value in obj.items():
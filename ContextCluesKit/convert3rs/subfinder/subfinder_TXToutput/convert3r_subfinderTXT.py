@@ -10,7 +10,6 @@ import argparse
 import json
 import os
 import sys
-from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Any
 
@@ -109,19 +108,19 @@ def main():
         if args.embed:
             embeddings = generate_embeddings(domains)
             for i, (domain, embedding) in enumerate(zip(domains, embeddings), 1):
-                record = OrderedDict({
+                record = {
                     "id": i,
                     "hostname": domain,
                     "text_embedding": embedding  # GUARANTEED 384-dim
-                })
+                }
                 records.append(record)
         else:
             # No embeddings
             for i, domain in enumerate(domains, 1):
-                record = OrderedDict({
+                record = {
                     "id": i,
                     "hostname": domain
-                })
+                }
                 records.append(record)
 
         safe_write_json(records, args.output_file)
@@ -10,7 +10,6 @@ import argparse
 import json
 import os
 import sys
-from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
@@ -94,14 +93,13 @@ def sanitize_value(val):
     return str(val)
 
 
-def parse_wafw00f_json(wafw00f_data, model=None) -> List[OrderedDict]:
+def parse_wafw00f_json(wafw00f_data, model=None) -> List[Dict[str, Any]]:
     parsed_findings = []
 
     results = wafw00f_data if isinstance(wafw00f_data, list) else [wafw00f_data]
 
     for i, result in enumerate(results, 1):
-        finding = OrderedDict()
-        finding["id"] = i
+        finding = {"id": i}
         finding["url"] = result.get("url", "unknown")
         finding["detected"] = result.get("detected", False)
         finding["firewall"] = result.get("firewall", "")
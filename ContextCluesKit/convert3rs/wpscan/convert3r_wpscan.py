@@ -9,9 +9,8 @@ Usage:
 import argparse
 import json
 import sys
-from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
 try:
     import torch
@@ -20,12 +19,22 @@ except ImportError:
     torch = None
     SentenceTransformer = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB output buffer
 
 
 def load_records(input_file: str) -> List[Dict[str, Any]]:
-    with open(input_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    if orjson is not None:
+        with open(input_file, "rb") as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(input_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
     if isinstance(data, list):
         return data
@@ -52,21 +61,30 @@ def record_to_text(record: Dict[str, Any]) -> str:
     return json.dumps(record, ensure_ascii=False, sort_keys=True, default=str)
 
 
-def add_id_first_wpscan(data: List[Dict[str, Any]], embeds: List[List[float]] | None = None) -> List[OrderedDict]:
-    results = []
-
-    for i, record in enumerate(data):
-        ordered = OrderedDict([("id", i + 1)])
+def add_id_first_wpscan(data: List[Dict[str, Any]], embeds: List[List[float]] | None = None) -> List[Dict[str, Any]]:
+    if embeds is None:
+        return [{"id": i, **record} for i, record in enumerate(data, 1)]
+    return [{"id": i, **record, "embed": emb} for i, (record, emb) in enumerate(zip(data, embeds), 1)]
 
-        for key, value in record.items():
-            ordered[key] = value
 
-        if embeds is not None:
-            ordered["embed"] = embeds[i]
+def write_json(obj: Any, output_file: str, pretty: bool = False) -> None:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(obj, option=option, default=str))
+        return
+    with open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        json.dump(obj, f, indent=2 if pretty else None, ensure_ascii=False, default=str)
 
-        results.append(ordered)
 
-    return results
+def write_ndjson(records: Iterable[Dict[str, Any]], output_file: str) -> None:
+    with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        for record in records:
+            if orjson is not None:
+                f.write(orjson.dumps(record, default=str))
+            else:
+                f.write(json.dumps(record, ensure_ascii=False, default=str).encode("utf-8"))
+            f.write(b"\n")
 
 
 def main() -> None:
@@ -77,6 +95,8 @@ def main() -> None:
     parser.add_argument("input_file", help="Input WPScan JSON file")
     parser.add_argument("-o", "--output-file", dest="output_file", help="Output JSON file")
     parser.add_argument("--embed", action="store_true", help="Add sentence-transformer embeddings to each record")
+    parser.add_argument("--ndjson", action="store_true", help="Write one JSON object per line instead of a JSON array")
+    parser.add_argument("--pretty", action="store_true", help="Indent the JSON output for readability")
 
     args = parser.parse_args()
 
@@ -93,8 +113,10 @@ def main() -> None:
         output_path = Path(args.output_file) if args.output_file else Path(args.input_file).with_suffix(".json")
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(records_with_id, f, indent=2, ensure_ascii=False, default=str)
+        if args.ndjson:
+            write_ndjson(records_with_id, output_path)
+        else:
+            write_json(records_with_id, output_path, pretty=args.pretty)
 
         print(f"✓ Processed {len(records_with_id)} records")
         print(f"  Input:  {args.input_file}")
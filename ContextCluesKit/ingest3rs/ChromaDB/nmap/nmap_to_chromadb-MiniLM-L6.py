@@ -12,12 +12,62 @@ Example:
 
 import sys
 import json
+import mmap
+import gzip
+import base64
+import hashlib
+import sqlite3
 import argparse
 import os
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
+import numpy as np
+import xxhash
 import chromadb
 from chromadb.config import Settings
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Hosts per collection.upsert() call; ChromaDB recommends batches of 100-250
+BATCH_SIZE = 200
+
+# Hosts handed to a parsing worker at a time
+PARSE_CHUNK_SIZE = 64
+
+# Smaller scans are parsed in-process; spawning workers would cost more
+PARALLEL_PARSE_MIN_HOSTS = 1000
+
+# Batches buffered between the parse, embed and insert stages
+PIPELINE_DEPTH = 4
+PIPELINE_END = object()
+
+# Keep-alive connections ChromaDB's pooled httpx client may hold open
+HTTP_MAX_CONNECTIONS = 8
+
+# Local model matching ChromaDB's default embedding function
+EMBED_MODEL = 'all-MiniLM-L6-v2'
+EMBED_BATCH_SIZE = 64
+
+# Shared read-only default for missing nested nmap objects
+EMPTY = {}
+
 
 def print_usage():
     """Print usage information."""
@@ -57,8 +107,20 @@ def validate_json_file(file_path):
 def load_json_data(file_path):
     """Load and parse JSON data from file."""
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        if orjson is not None:
+            # Parse straight from the page cache instead of copying the file into memory
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    data = orjson.loads(b'')
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mm, 'madvise'):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        with memoryview(mm) as view:
+                            data = orjson.loads(view)
+        else:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
         print(f"✓ Successfully loaded JSON from '{file_path}'")
         return data
     except json.JSONDecodeError as e:
@@ -70,21 +132,50 @@ def load_json_data(file_path):
         return None
 
 
+def iter_hosts(file_path):
+    """Yield host entries from an nmap JSON file one at a time.
+
+    With ijson installed the file is streamed and only one host dict is held
+    in memory at a time; otherwise the whole document is loaded with json.
+    """
+    if ijson is None:
+        data = load_json_data(file_path)
+        if data is None:
+            return
+        hosts = data.get('nmaprun', {}).get('host', [])
+        if isinstance(hosts, dict):
+            hosts = [hosts]
+        yield from hosts
+        return
+
+    found = False
+    with open(file_path, 'rb') as f:
+        for host in ijson.items(f, 'nmaprun.host.item', use_float=True):
+            found = True
+            yield host
+
+    if not found:
+        # A scan with a single host stores it as an object instead of a list
+        with open(file_path, 'rb') as f:
+            for host in ijson.items(f, 'nmaprun.host', use_float=True):
+                if isinstance(host, dict):
+                    yield host
+
+
 def extract_host_info(host):
     """Extract relevant information from a host entry."""
     info = {}
     
-    # Extract IP address
-    if isinstance(host.get('address'), dict):
-        info['ip_address'] = host['address'].get('@addr', 'unknown')
-    elif isinstance(host.get('address'), list):
-        for addr in host['address']:
-            if addr.get('@addrtype') == 'ipv4':
-                info['ip_address'] = addr.get('@addr', 'unknown')
-                break
-            elif addr.get('@addrtype') == 'mac':
-                info['mac_address'] = addr.get('@addr', 'unknown')
-                info['vendor'] = addr.get('@vendor', 'unknown')
+    # Extract IP and MAC addresses, keyed by address type
+    addrs = host.get('address')
+    addrs = [addrs] if isinstance(addrs, dict) else (addrs or [])
+    by_type = {addr.get('@addrtype'): addr for addr in addrs}
+    
+    info['ip_address'] = (by_type.get('ipv4') or by_type.get('ipv6') or EMPTY).get('@addr', 'unknown')
+    mac = by_type.get('mac')
+    if mac:
+        info['mac_address'] = mac.get('@addr', 'unknown')
+        info['vendor'] = mac.get('@vendor', 'unknown')
     
     # Extract hostname
     hostnames = host.get('hostnames')
@@ -98,26 +189,26 @@ def extract_host_info(host):
     info['state'] = status.get('@state', 'unknown')
     
     # Extract ports
-    ports_info = []
-    ports = host.get('ports', {})
-    port_list = ports.get('port', [])
+    port_list = (host.get('ports') or EMPTY).get('port', [])
     
     if isinstance(port_list, dict):
         port_list = [port_list]
     
-    for port in port_list:
-        port_info = {
+    ports_info = [
+        {
             'port': port.get('@portid', 'unknown'),
             'protocol': port.get('@protocol', 'unknown'),
-            'state': port.get('state', {}).get('@state', 'unknown'),
-            'service': port.get('service', {}).get('@name', 'unknown'),
-            'product': port.get('service', {}).get('@product', ''),
-            'version': port.get('service', {}).get('@version', '')
+            'state': (port.get('state') or EMPTY).get('@state', 'unknown'),
+            'service': service.get('@name', 'unknown'),
+            'product': service.get('@product', ''),
+            'version': service.get('@version', '')
         }
-        ports_info.append(port_info)
+        for port in port_list
+        for service in (port.get('service') or EMPTY,)
+    ]
     
     info['ports'] = ports_info
-    info['open_port_count'] = len([p for p in ports_info if p['state'] == 'open'])
+    info['open_port_count'] = sum(1 for p in ports_info if p['state'] == 'open')
     
     # Extract OS info if available
     os_matches = host.get('os', {}).get('osmatch', [])
@@ -132,43 +223,239 @@ def extract_host_info(host):
 
 
 def create_document_text(host_info):
-    """Create searchable text document from host info."""
-    parts = []
+    """Create the short searchable text that gets embedded for a host.
+    
+    Only names go into the document; the full port table is stored in the
+    ports_gz metadata field (see pack_ports).
+    """
+    fields = [('IP Address', host_info.get('ip_address', 'unknown'))]
+    
+    if 'hostname' in host_info:
+        fields.append(('Hostname', host_info['hostname']))
+    
+    if host_info.get('vendor', 'unknown') != 'unknown':
+        fields.append(('Vendor', host_info['vendor']))
+    
+    if 'os_name' in host_info:
+        fields.append(('Operating System', host_info['os_name']))
+    
+    # Distinct open services in port order, e.g. "ssh OpenSSH, http nginx"
+    services = dict.fromkeys(
+        f"{port['service']} {port['product']}" if port.get('product') else port['service']
+        for port in host_info.get('ports', ())
+        if port['state'] == 'open'
+    )
+    if services:
+        fields.append(('Services', ', '.join(services)))
+    
+    return "\n".join(f"{label}: {value}" for label, value in fields)
+
+
+def format_port(port):
+    """Format a port entry as 'port/protocol: service (product version)'."""
+    service_info = f"{port['port']}/{port['protocol']}: {port['service']}"
+    if port.get('product'):
+        service_info += f" ({port['product']}"
+        if port.get('version'):
+            service_info += f" {port['version']}"
+        service_info += ")"
+    return service_info
+
+
+def pack_ports(ports):
+    """Gzip and base64 the port table so it fits in a flat ChromaDB metadata string."""
+    raw = json.dumps(ports, separators=(',', ':')).encode()
+    return base64.b64encode(gzip.compress(raw, mtime=0)).decode('ascii')
+
+
+def process_host(item):
+    """Turn an (index, host) pair into the (document, metadata, id) stored in ChromaDB."""
+    idx, host = item
+    host_info = extract_host_info(host)
+    
+    # Create document text
+    doc_text = create_document_text(host_info)
     
-    parts.append(f"IP Address: {host_info.get('ip_address', 'unknown')}")
+    # Create metadata (ChromaDB metadata must be flat dict with simple types)
+    metadata = {
+        'ip_address': host_info.get('ip_address', 'unknown'),
+        'state': host_info.get('state', 'unknown'),
+        'open_port_count': host_info.get('open_port_count', 0)
+    }
     
     if 'hostname' in host_info:
-        parts.append(f"Hostname: {host_info['hostname']}")
+        metadata['hostname'] = host_info['hostname']
     
     if 'mac_address' in host_info:
-        parts.append(f"MAC Address: {host_info['mac_address']}")
-        if 'vendor' in host_info and host_info['vendor'] != 'unknown':
-            parts.append(f"Vendor: {host_info['vendor']}")
+        metadata['mac_address'] = host_info['mac_address']
     
-    parts.append(f"Status: {host_info.get('state', 'unknown')}")
+    if 'vendor' in host_info and host_info['vendor'] != 'unknown':
+        metadata['vendor'] = host_info['vendor']
     
     if 'os_name' in host_info:
-        parts.append(f"Operating System: {host_info['os_name']} (Accuracy: {host_info['os_accuracy']}%)")
-    
-    # Add port information
-    if host_info.get('ports'):
-        parts.append(f"\nOpen Ports: {host_info.get('open_port_count', 0)}")
-        for port in host_info['ports']:
-            if port['state'] == 'open':
-                service_info = f"{port['port']}/{port['protocol']}: {port['service']}"
-                if port.get('product'):
-                    service_info += f" ({port['product']}"
-                    if port.get('version'):
-                        service_info += f" {port['version']}"
-                    service_info += ")"
-                parts.append(service_info)
-    
-    return "\n".join(parts)
-
-
-def import_to_chromadb(data):
-    """Import nmap data into ChromaDB collection."""
+        metadata['os_name'] = host_info['os_name']
+        metadata['os_accuracy'] = host_info['os_accuracy']
+    
+    if host_info['ports']:
+        metadata['ports_gz'] = pack_ports(host_info['ports'])
+        first_tcp = next(
+            (port for port in host_info['ports'] if port['state'] == 'open' and port['protocol'] == 'tcp'),
+            None
+        )
+        if first_tcp:
+            metadata['first_open_service'] = format_port(first_tcp)
+        
+        # Open port numbers and service names as metadata arrays, so queries
+        # can filter exactly with where={"open_ports": {"$contains": 22}}
+        open_ports = [port for port in host_info['ports'] if port['state'] == 'open']
+        port_numbers = [int(port['port']) for port in open_ports if port['port'].isdigit()]
+        if port_numbers:
+            metadata['open_ports'] = port_numbers
+        if open_ports:
+            metadata['services'] = list(dict.fromkeys(port['service'] for port in open_ports))
+    
+    # Stable ID from the IP so re-importing a scan updates hosts in place;
+    # hosts without an IP fall back to their position in the file
+    ip_address = host_info['ip_address']
+    key = ip_address if ip_address != 'unknown' else f"unknown_{idx}"
+    host_id = xxhash.xxh3_64_hexdigest(key.encode())
+    
+    return doc_text, metadata, host_id
+
+
+def open_parse_pool(hosts, workers=None):
+    """Return (hosts, executor, workers) for process_hosts().
+    
+    Peeks at the start of hosts and returns executor None (parse in-process)
+    when the scan is small. The pool uses spawn rather than fork, since the
+    importer also runs threads and torch.
+    """
+    hosts = iter(hosts)
+    head = list(islice(hosts, PARALLEL_PARSE_MIN_HOSTS))
+    hosts = chain(head, hosts)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(head) < PARALLEL_PARSE_MIN_HOSTS:
+        return hosts, None, 1
+    
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return hosts, executor, workers
+
+
+def process_hosts(hosts, executor=None, workers=1):
+    """Yield process_host() results in order, spreading the work over executor if given."""
+    items = enumerate(hosts)
+    if executor is None:
+        yield from map(process_host, items)
+        return
+    
+    # Read ahead only a window of hosts so streaming input stays bounded
+    window = PARSE_CHUNK_SIZE * workers
+    while True:
+        chunk = list(islice(items, window))
+        if not chunk:
+            break
+        yield from executor.map(process_host, chunk, chunksize=PARSE_CHUNK_SIZE)
+
+
+def open_embedding_cache(path):
+    """Open (creating if needed) the sqlite cache of document embeddings."""
+    cache = sqlite3.connect(path, check_same_thread=False)
+    cache.execute("CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, emb BLOB)")
+    return cache
+
+
+def document_hash(document):
+    """Cache key for a document: blake2b of the model name and document text."""
+    return hashlib.blake2b(f"{EMBED_MODEL}\0{document}".encode(), digest_size=16).digest()
+
+
+def embed_batch(documents, model=None, pool=None, cache=None):
+    """Embed one batch locally as a numpy array; None lets ChromaDB embed instead.
+    
+    With a cache, only documents whose hash is not stored yet are encoded.
+    """
+    if model is None:
+        return None
+    
+    if cache is None:
+        return encode_documents(documents, model, pool)
+    
+    hashes = [document_hash(document) for document in documents]
+    placeholders = ','.join('?' * len(hashes))
+    cached = {
+        key: np.frombuffer(emb, dtype=np.float32)
+        for key, emb in cache.execute(f"SELECT hash, emb FROM embeddings WHERE hash IN ({placeholders})", hashes)
+    }
+    
+    missing = [i for i, key in enumerate(hashes) if key not in cached]
+    if missing:
+        encoded = encode_documents([documents[i] for i in missing], model, pool).astype(np.float32)
+        rows = [(hashes[i], emb.tobytes()) for i, emb in zip(missing, encoded)]
+        cache.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?)", rows)
+        cache.commit()
+        cached.update((hashes[i], emb) for i, emb in zip(missing, encoded))
+    
+    return np.stack([cached[key] for key in hashes])
+
+
+def encode_documents(documents, model, pool=None):
+    """Encode documents with the local model into normalized embeddings."""
+    if pool is not None:
+        embeddings = model.encode_multi_process(
+            documents, pool, batch_size=EMBED_BATCH_SIZE, normalize_embeddings=True
+        )
+    else:
+        embeddings = model.encode(
+            documents,
+            batch_size=EMBED_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+    return embeddings
+
+
+def quantize_embeddings(embeddings):
+    """Snap unit-length embeddings to an int8 grid.
+    
+    Returns the int8 codes and the float32 vectors they decode to, which
+    are what ChromaDB indexes so stored and searched vectors agree.
+    """
+    codes = np.clip(np.round(embeddings * 127), -128, 127).astype(np.int8)
+    return codes, codes.astype(np.float32) / 127.0
+
+
+def run_stage(inbox, outbox, work, errors):
+    """Pipeline stage: apply work() to each item from inbox and pass results to outbox."""
+    while True:
+        item = inbox.get()
+        if item is PIPELINE_END:
+            break
+        if errors:
+            # Keep draining after a failure so upstream stages never block
+            continue
+        try:
+            result = work(item)
+        except Exception as e:
+            errors.append(e)
+            continue
+        if outbox is not None:
+            outbox.put(result)
+    
+    if outbox is not None:
+        outbox.put(PIPELINE_END)
+
+
+def import_to_chromadb(hosts, devices=None, workers=None, quantize=False, embed_cache=None):
+    """Import nmap hosts (any iterable of host dicts) into ChromaDB collection."""
+    model = None
+    pool = None
+    cache = None
+    executor = None
     try:
+        # Start the parsing pool before any threads or torch state exist
+        hosts, executor, workers = open_parse_pool(hosts, workers)
+        
         chromadb_host = os.getenv("CHROMADB_HOST", "localhost")
         chromadb_port = int(os.getenv("CHROMADB_PORT", "9000"))
 
@@ -177,7 +464,12 @@ def import_to_chromadb(data):
             host=chromadb_host,
             port=chromadb_port,
             # Include token if authentication is enabled
-            headers={"Authorization": "Bearer my-secret-token"}
+            headers={"Authorization": "Bearer my-secret-token"},
+            # Reuse pooled keep-alive connections across batch inserts
+            settings=Settings(
+                chroma_http_max_connections=HTTP_MAX_CONNECTIONS,
+                chroma_http_max_keepalive_connections=HTTP_MAX_CONNECTIONS
+            )
         )
                 
         # Create or get collection
@@ -189,72 +481,99 @@ def import_to_chromadb(data):
             collection = client.create_collection(name=collection_name)
             print(f"✓ Created new collection '{collection_name}'")
         
-        # Extract hosts from JSON
-        nmaprun = data.get('nmaprun', {})
-        hosts = nmaprun.get('host', [])
+        # Embed outside of ChromaDB when sentence-transformers is available
+        if SentenceTransformer is not None:
+            model = SentenceTransformer(EMBED_MODEL)
+            if devices and len(devices) > 1:
+                pool = model.start_multi_process_pool(devices)
+            elif devices:
+                model = model.to(devices[0])
+            print(f"✓ Embedding locally with '{EMBED_MODEL}'")
+            if embed_cache:
+                cache = open_embedding_cache(embed_cache)
+                print(f"✓ Caching embeddings in '{embed_cache}'")
+        elif quantize:
+            print("⚠️  Warning: --quantize needs sentence-transformers; storing ChromaDB's own embeddings.")
         
-        if isinstance(hosts, dict):
-            hosts = [hosts]
+        print("\n📊 Processing hosts...")
         
-        if not hosts:
-            print("⚠️  Warning: No hosts found in the JSON data.")
-            return
+        # Embedding and inserting run in their own threads so they overlap
+        # with parsing; embedding (torch) and HTTP inserts release the GIL
+        def embed_stage(batch):
+            documents, metadatas, ids = batch
+            embeddings = embed_batch(documents, model, pool, cache)
+            if embeddings is None:
+                return documents, metadatas, ids, None
+            if quantize:
+                # Keep the compact int8 codes alongside each host
+                codes, embeddings = quantize_embeddings(embeddings)
+                for metadata, code in zip(metadatas, codes):
+                    metadata['emb_q'] = base64.b64encode(code.tobytes()).decode('ascii')
+            return documents, metadatas, ids, embeddings.tolist()
         
-        print(f"\n📊 Processing {len(hosts)} hosts...")
+        def insert_stage(batch):
+            documents, metadatas, ids, embeddings = batch
+            collection.upsert(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
         
-        # Prepare data for ChromaDB
-        documents = []
-        metadatas = []
-        ids = []
+        embed_queue = queue.Queue(maxsize=PIPELINE_DEPTH)
+        insert_queue = queue.Queue(maxsize=PIPELINE_DEPTH)
+        errors = []
+        stages = [
+            threading.Thread(target=run_stage, args=(embed_queue, insert_queue, embed_stage, errors), daemon=True),
+            threading.Thread(target=run_stage, args=(insert_queue, None, insert_stage, errors), daemon=True)
+        ]
+        for stage in stages:
+            stage.start()
         
-        for idx, host in enumerate(hosts):
-            host_info = extract_host_info(host)
-            
-            # Create document text
-            doc_text = create_document_text(host_info)
-            documents.append(doc_text)
-            
-            # Create metadata (ChromaDB metadata must be flat dict with simple types)
-            metadata = {
-                'ip_address': host_info.get('ip_address', 'unknown'),
-                'state': host_info.get('state', 'unknown'),
-                'open_port_count': host_info.get('open_port_count', 0)
-            }
-            
-            if 'hostname' in host_info:
-                metadata['hostname'] = host_info['hostname']
-            
-            if 'mac_address' in host_info:
-                metadata['mac_address'] = host_info['mac_address']
-            
-            if 'vendor' in host_info and host_info['vendor'] != 'unknown':
-                metadata['vendor'] = host_info['vendor']
-            
-            if 'os_name' in host_info:
-                metadata['os_name'] = host_info['os_name']
-                metadata['os_accuracy'] = host_info['os_accuracy']
-            
-            metadatas.append(metadata)
+        def hand_off(batch):
+            ids = list(batch)
+            metadatas = [batch[i][1] for i in ids]
+            embed_queue.put(([batch[i][0] for i in ids], metadatas, ids))
+            return sum(1 for metadata in metadatas if metadata['state'] == 'up')
+        
+        # Prepare data for ChromaDB, keyed by ID: a host scanned twice keeps
+        # its last entry, as upsert() rejects a batch with repeated IDs
+        batch = {}
+        total = 0
+        up_count = 0
+        
+        try:
+            for doc_text, metadata, host_id in process_hosts(hosts, executor, workers):
+                batch.pop(host_id, None)
+                batch[host_id] = (doc_text, metadata)
+                
+                # Hand off full batches so memory stays bounded
+                if len(batch) == BATCH_SIZE:
+                    if errors:
+                        break
+                    up_count += hand_off(batch)
+                    total += len(batch)
+                    batch = {}
             
-            # Create unique ID
-            ids.append(f"host_{idx}_{host_info.get('ip_address', 'unknown').replace('.', '_')}")
+            if batch and not errors:
+                up_count += hand_off(batch)
+                total += len(batch)
+        finally:
+            embed_queue.put(PIPELINE_END)
+            for stage in stages:
+                stage.join()
         
-        # Add to collection
-        collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        if errors:
+            raise errors[0]
         
-        print(f"\n✅ Successfully imported {len(hosts)} hosts to ChromaDB collection '{collection_name}'")
+        if not total:
+            print("⚠️  Warning: No hosts found in the JSON data.")
+            return
+        
+        print(f"\n✅ Successfully imported {total} hosts to ChromaDB collection '{collection_name}'")
         
         # Print summary
         print("\n" + "="*70)
         print("Import Summary")
         print("="*70)
         print(f"Collection: {collection_name}")
-        print(f"Total hosts: {len(hosts)}")
-        print(f"Hosts up: {len([h for h in hosts if extract_host_info(h).get('state') == 'up'])}")
+        print(f"Total hosts: {total}")
+        print(f"Hosts up: {up_count}")
         print(f"Total documents in collection: {collection.count()}")
         print("="*70)
         
@@ -273,6 +592,13 @@ def import_to_chromadb(data):
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+        if cache is not None:
+            cache.close()
 
 
 def main():
@@ -282,6 +608,12 @@ def main():
         usage='python nmap_to_chromadb-MiniLM-L6.py <json_file_path>'
     )
     parser.add_argument('json_file', nargs='?', help='Path to the nmap JSON file')
+    parser.add_argument('--workers', type=int, help='Processes used to parse large scans (default: CPU count)')
+    parser.add_argument('--quantize', action='store_true',
+                        help='Snap local embeddings to int8 and keep the codes in emb_q metadata')
+    parser.add_argument('--embed-cache', metavar='PATH',
+                        help='sqlite file caching local embeddings so unchanged hosts are not re-encoded')
+    parser.add_argument('--devices', help='Comma-separated devices for local embedding, e.g. cuda:0,cuda:1')
     
     args = parser.parse_args()
     
@@ -296,13 +628,9 @@ def main():
         print_usage()
         sys.exit(1)
     
-    # Load JSON data
-    data = load_json_data(args.json_file)
-    if data is None:
-        sys.exit(1)
-    
-    # Import to ChromaDB
-    success = import_to_chromadb(data)
+    # Import to ChromaDB, streaming hosts straight from the file
+    devices = args.devices.split(',') if args.devices else None
+    success = import_to_chromadb(iter_hosts(args.json_file), devices, args.workers, args.quantize, args.embed_cache)
     
     if success:
         sys.exit(0)
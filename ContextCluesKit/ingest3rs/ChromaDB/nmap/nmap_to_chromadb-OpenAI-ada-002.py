@@ -13,6 +13,7 @@ Example:
 import os
 import sys
 import json
+import mmap
 import argparse
 from pathlib import Path
 import chromadb
@@ -20,6 +21,11 @@ from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def print_usage():
     """Print usage information."""
@@ -59,8 +65,20 @@ def validate_json_file(file_path):
 def load_json_data(file_path):
     """Load and parse JSON data from file."""
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        if orjson is not None:
+            # Parse straight from the page cache instead of copying the file into memory
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    data = orjson.loads(b'')
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mm, 'madvise'):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        with memoryview(mm) as view:
+                            data = orjson.loads(view)
+        else:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
         print(f"✓ Successfully loaded JSON from '{file_path}'")
         return data
     except json.JSONDecodeError as e:
@@ -219,9 +237,12 @@ def import_to_chromadb(data):
         documents = []
         metadatas = []
         ids = []
+        up_count = 0
         
         for idx, host in enumerate(hosts):
             host_info = extract_host_info(host)
+            if host_info['state'] == 'up':
+                up_count += 1
             
             # Create document text
             doc_text = create_document_text(host_info)
@@ -267,7 +288,7 @@ def import_to_chromadb(data):
         print("="*70)
         print(f"Collection: {collection_name}")
         print(f"Total hosts: {len(hosts)}")
-        print(f"Hosts up: {len([h for h in hosts if extract_host_info(h).get('state') == 'up'])}")
+        print(f"Hosts up: {up_count}")
         print(f"Total documents in collection: {collection.count()}")
         print("="*70)
         
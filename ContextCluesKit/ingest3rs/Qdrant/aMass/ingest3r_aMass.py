@@ -4,16 +4,27 @@ import argparse
 from typing import List
 from qdrant_client import QdrantClient, models
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 '''
 Notes: Amass ingest3r should only be used for Amass results in a vectorization process.
 '''
 QDRANT_URL = "http://localhost:6333"
+QDRANT_GRPC_PORT = 6334  # bulk upserts go over gRPC (protobuf) instead of REST/JSON
+PAYLOAD_INDEX_FIELDS = ("source", "relation", "target")  # keyword-indexed for filtering
 
 
 def load_json(path: str) -> List[dict]:
     """Load list of records from JSON file."""
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    if orjson is not None:
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
     if not isinstance(data, list):
         raise ValueError("Top-level JSON must be a list of objects")
     return data
@@ -26,18 +37,23 @@ def make_dummy_vector(dim: int) -> List[float]:
 
 def ensure_collection(client: QdrantClient, collection_name: str, vector_size: int):
     """Create collection if it does not exist."""
-    collections = client.get_collections().collections
-    existing = {c.name for c in collections}
-    if collection_name in existing:
+    if client.collection_exists(collection_name):
         return
 
-    client.recreate_collection(
+    client.create_collection(
         collection_name=collection_name,
         vectors_config=models.VectorParams(
             size=vector_size,
             distance=models.Distance.COSINE,
+            on_disk=True,
         ),
+        # Vectors are random placeholders, so skip building an HNSW graph over them
+        hnsw_config=models.HnswConfigDiff(m=0, ef_construct=4),
     )
+    for field in PAYLOAD_INDEX_FIELDS:
+        client.create_payload_index(
+            collection_name, field_name=field, field_schema=models.PayloadSchemaType.KEYWORD
+        )
 
 
 def upload_records(
@@ -86,7 +102,7 @@ def main():
     args = parser.parse_args()
 
     records = load_json(args.json_path)
-    client = QdrantClient(url=QDRANT_URL)
+    client = QdrantClient(url=QDRANT_URL, grpc_port=QDRANT_GRPC_PORT, prefer_grpc=True)
 
     ensure_collection(client, args.collection, args.vector_size)
     upload_records(client, records, args.collection, args.vector_size)
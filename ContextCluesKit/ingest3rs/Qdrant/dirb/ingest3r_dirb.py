@@ -3,16 +3,30 @@ import json
 import argparse
 from typing import List, Dict, Any
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import (
+    Distance, VectorParams, PointStruct, HnswConfigDiff, PayloadSchemaType,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, FilterSelector, Filter,
+)
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DEFAULT_VECTOR_SIZE = 384
 DEFAULT_QDRANT_URL = "http://localhost:6333"
+DEFAULT_GRPC_PORT = 6334  # bulk upserts go over gRPC (protobuf) instead of REST/JSON
+PAYLOAD_INDEX_FIELDS = ("type", "status_code", "url")  # keyword-indexed for filtering
 
 def load_dirb_json(json_file: str) -> List[Dict[str, Any]]:
     """Load parsed dirb JSON file."""
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    if orjson is not None:
+        with open(json_file, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
 
     if isinstance(data, dict):
         return data.get('results', [])
@@ -20,9 +34,46 @@ def load_dirb_json(json_file: str) -> List[Dict[str, Any]]:
         return data
     return []
 
-def create_dummy_vector(dim: int) -> List[float]:
-    """Generate a dummy vector for dirb entries (replace with real embeddings later)."""
-    return list(np.random.rand(dim).astype(np.float32))
+def create_dummy_vectors(count: int, dim: int) -> np.ndarray:
+    """Generate one dummy vector per dirb entry in a single call (replace with real embeddings later)."""
+    return np.random.default_rng().random((count, dim), dtype=np.float32)
+
+def config_matches(config, vector_size: int) -> bool:
+    """True if an existing collection config is the one create_collection below would build."""
+    vectors = config.params.vectors
+    quantization = config.quantization_config
+    return (
+        isinstance(vectors, VectorParams)
+        and vectors.size == vector_size
+        and vectors.distance == Distance.COSINE
+        and bool(vectors.on_disk)
+        and config.hnsw_config.m == 0
+        and isinstance(quantization, ScalarQuantization)
+        and quantization.scalar.type == ScalarType.INT8
+    )
+
+def reset_collection(client: QdrantClient, collection_name: str, vector_size: int) -> bool:
+    """Empty a collection with a matching config, or (re)create it; True if reused."""
+    if client.collection_exists(collection_name):
+        if config_matches(client.get_collection(collection_name).config, vector_size):
+            # Deleting the points keeps the collection's config and payload indexes
+            client.delete(collection_name, points_selector=FilterSelector(filter=Filter()), wait=True)
+            return True
+        client.delete_collection(collection_name)
+
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE, on_disk=True),
+        # Dummy vectors only, so there is nothing worth indexing with HNSW
+        hnsw_config=HnswConfigDiff(m=0, ef_construct=4),
+        # int8 copies are a quarter of the float32 size; precision is moot for dummies
+        quantization_config=ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        ),
+    )
+    for field in PAYLOAD_INDEX_FIELDS:
+        client.create_payload_index(collection_name, field_name=field, field_schema=PayloadSchemaType.KEYWORD)
+    return False
 
 def import_to_qdrant(
     json_file: str,
@@ -31,15 +82,14 @@ def import_to_qdrant(
     qdrant_url: str = DEFAULT_QDRANT_URL,
 ) -> None:
     """Import dirb results into a Qdrant collection with chosen vector size."""
-    client = QdrantClient(url=qdrant_url)
+    client = QdrantClient(url=qdrant_url, grpc_port=DEFAULT_GRPC_PORT, prefer_grpc=True)
     print(f"✓ Connected to Qdrant at {qdrant_url}")
 
     try:
-        client.recreate_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
-        )
-        print(f"✓ Collection '{collection_name}' created with vector size {vector_size}")
+        if reset_collection(client, collection_name, vector_size):
+            print(f"✓ Collection '{collection_name}' emptied for re-import (vector size {vector_size})")
+        else:
+            print(f"✓ Collection '{collection_name}' created with vector size {vector_size}")
     except Exception as e:
         print(f"❌ Failed to create/recreate collection: {e}")
         return
@@ -50,6 +100,7 @@ def import_to_qdrant(
         return
     print(f"✓ Loaded {len(entries)} dirb results from '{json_file}'")
 
+    vectors = create_dummy_vectors(len(entries), vector_size)
     points: List[PointStruct] = []
     for i, entry in enumerate(entries):
         if not isinstance(entry, dict):
@@ -61,7 +112,7 @@ def import_to_qdrant(
 
         point = PointStruct(
             id=point_id,
-            vector=create_dummy_vector(vector_size),
+            vector=vectors[i],
             payload=payload,
         )
         points.append(point)
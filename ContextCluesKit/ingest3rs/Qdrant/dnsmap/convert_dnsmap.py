@@ -6,20 +6,25 @@ Usage: convert_dnsmap.py [-h] input_file [output_file]
 import argparse
 import csv
 import json
+import logging
 import re
 import sys
 import os
 
+MD_HOST_RE = re.compile(r'\[([^\]]+)\].*')
+
+log = logging.getLogger(__name__)
+
 
 def parse_csv_row(hostname: str, ip_addresses: str) -> list:
     """Parse a single CSV row into multiple DNS records."""
     records = []
     
     # Clean hostname (remove markdown links like [www.example.com](https://...))
-    hostname = re.sub(r'\[([^\]]+)\].*', r'\1', hostname.strip())
+    hostname = MD_HOST_RE.sub(r'\1', hostname.strip())
     
     # Split IPs by comma
-    ips = [ip.strip() for ip in ip_addresses.split(',') if ip.strip()]
+    ips = [ip for ip in map(str.strip, ip_addresses.split(',')) if ip]
     
     # Create one record per IP
     for ip in ips:
@@ -38,15 +43,17 @@ def parse_csv_row(hostname: str, ip_addresses: str) -> list:
 def convert_csv_to_dnsrecon(input_file: str, output_file: str) -> None:
     """Convert CSV to DNSRecon JSON format."""
     all_records = []
+    hosts = 0
+    skipped = 0
     
     print(f"📖 Reading {input_file}...")
     with open(input_file, 'r', encoding='utf-8') as csvfile:
         reader = csv.reader(csvfile)
-        row_num = 0
         
-        for row in reader:
+        for row_num, row in enumerate(reader, 1):
             if not row or len(row) < 2:
-                print(f"⚠️  Skipping empty row {row_num}")
+                skipped += 1
+                log.debug("Skipping empty row %d", row_num)
                 continue
                 
             hostname = row[0]
@@ -54,10 +61,10 @@ def convert_csv_to_dnsrecon(input_file: str, output_file: str) -> None:
             
             records = parse_csv_row(hostname, ip_list)
             all_records.extend(records)
-            
-            print(f"  → {hostname}: {len(records)} IPs")
-            row_num += 1
+            hosts += 1
+            log.debug("%s: %d IPs", hostname, len(records))
     
+    print(f"  → {hosts} hosts parsed, {skipped} rows skipped")
     print(f"\n💾 Writing {len(all_records)} records to {output_file}...")
     
     with open(output_file, 'w', encoding='utf-8') as jsonfile:
@@ -77,9 +84,16 @@ def main() -> None:
     parser.add_argument("input_file", help="Input CSV file")
     parser.add_argument("output_file", nargs="?", 
                        help="Output JSON file (default: input_file.json)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                       help="Log a line for every parsed or skipped row")
     
     args = parser.parse_args()
     
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(levelname)s: %(message)s",
+    )
+    
     if not os.path.exists(args.input_file):
         print(f"Error: '{args.input_file}' not found", file=sys.stderr)
         sys.exit(1)
@@ -1,20 +1,79 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import logging
 import os
-import random
 import sys
 import time
-from typing import List, Dict, Any, Optional
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
+import numpy as np
 from qdrant_client import QdrantClient, models
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
-def load_dnsrecon_json(path: str) -> List[Dict[str, Any]]:
-    """Load ALL DNSRecon JSON content - handles ANY structure."""
-    print(f"DEBUG: Loading complete DNSRecon JSON from {path}")
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+UPLOAD_BATCH_SIZE = 512  # upper bound; the batch size is derived from the record size
+MIN_UPLOAD_BATCH_SIZE = 16
+UPLOAD_BATCH_BYTES = 2 * 1024 * 1024  # target size of one upload request
+BATCH_SIZE_SAMPLE = 16  # records serialized to estimate the average payload size
+INDEXING_THRESHOLD = 20000  # Qdrant's default, restored when the upload ends
+TOP_LEVEL_FIELDS = ("name", "domain", "port", "id")
+
+# Fallback keys for the normalized payload fields, in order of preference
+_HOST_KEYS = ("host", "name", "domain")
+_IP_KEYS = ("address", "ip", "ptr")
+_TYPE_KEYS = ("type", "rrtype")
+
+# Payload fields given keyword indexes so filters on them avoid a full scan
+PAYLOAD_INDEX_FIELDS = ("host", "address", "record_type")
+
+# Debug output is off unless -v/--verbose is given
+log = logging.getLogger(__name__)
+
+
+def _starts_with_array(path: str) -> bool:
+    """Peek at the first non-whitespace byte to see if the JSON root is an array."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return False
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped.startswith(b"[")
+
+
+def _stream_array(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the items of a top-level JSON array one at a time."""
+    with open(path, "rb") as f:
+        yield from ijson.items(f, "item", use_float=True)
+
+
+def load_dnsrecon_json(path: str) -> Iterable[Dict[str, Any]]:
+    """Load ALL DNSRecon JSON content - handles ANY structure.
+
+    A top-level array is streamed record by record when ijson is installed.
+    """
+    log.debug("Loading complete DNSRecon JSON from %s", path)
+    if ijson is not None and _starts_with_array(path):
+        log.debug("Streaming top-level array with ijson")
+        return _stream_array(path)
+
+    if orjson is not None:
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
     records = []
     
@@ -36,17 +95,12 @@ def load_dnsrecon_json(path: str) -> List[Dict[str, Any]]:
     else:
         raise ValueError("Invalid JSON format")
 
-    print(f"DEBUG: Extracted {len(records)} total records")
+    log.debug("Extracted %d total records", len(records))
     if records:
-        print(f"DEBUG: First record keys: {list(records[0].keys())}")
+        log.debug("First record keys: %s", list(records[0].keys()))
     return records
 
 
-def make_dnsrecon_vector(dim: int = 128) -> List[float]:
-    """Generate dummy vector for DNSRecon records."""
-    return [random.uniform(-1.0, 1.0) for _ in range(dim)]
-
-
 def save_upload_report(collection_name: str, points_count: int, input_file: str, output_json: Optional[str]) -> None:
     """Save detailed upload summary."""
     report = {
@@ -65,23 +119,33 @@ def save_upload_report(collection_name: str, points_count: int, input_file: str,
 
 def ensure_collection(client: QdrantClient, collection_name: str, dim: int) -> None:
     """Create or recreate Qdrant collection."""
-    print(f"DEBUG: Checking collection '{collection_name}'...")
+    log.debug("Checking collection '%s'...", collection_name)
     
     if client.collection_exists(collection_name):
-        print(f"DEBUG: Deleting existing '{collection_name}'...")
+        log.debug("Deleting existing '%s'...", collection_name)
         client.delete_collection(collection_name)
-        time.sleep(1)
 
-    print(f"DEBUG: Creating collection with dim={dim}...")
+    log.debug("Creating collection with dim=%d...", dim)
     client.create_collection(
         collection_name=collection_name,
         vectors_config=models.VectorParams(
             size=dim,
             distance=models.Distance.COSINE,
+            on_disk=True,
+            # Placeholder values need no float32 precision; half the storage
+            datatype=models.Datatype.FLOAT16,
         ),
+        # Placeholder vectors: no HNSW graph, records are found by payload
+        hnsw_config=models.HnswConfigDiff(m=0, ef_construct=4),
+        # No segment indexing while the bulk upload is running
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
     )
+    for field in PAYLOAD_INDEX_FIELDS:
+        client.create_payload_index(
+            collection_name, field_name=field, field_schema=models.PayloadSchemaType.KEYWORD
+        )
     
-    time.sleep(1)
+    # create_collection returns once the collection exists, so check right away
     if client.collection_exists(collection_name):
         info = client.get_collection(collection_name)
         print(f"✓ Collection '{collection_name}' created (dim={info.config.params.vectors.size})")
@@ -89,15 +153,27 @@ def ensure_collection(client: QdrantClient, collection_name: str, dim: int) -> N
         raise RuntimeError(f"Failed to create collection '{collection_name}'")
 
 
-def create_dnsrecon_point(record: Dict[str, Any], dim: int, index: int) -> models.PointStruct:
+def _first_value(record: Dict[str, Any], keys: Tuple[str, ...], default: Any) -> Any:
+    """Return the first truthy value of record under keys, else default."""
+    return next(filter(None, map(record.get, keys)), default)
+
+
+def estimate_batch_size(sample: List[Any], dim: int) -> int:
+    """Points per upload batch so that one request carries about UPLOAD_BATCH_BYTES."""
+    avg_payload = sum(len(json.dumps(r, default=str)) for r in sample) // max(len(sample), 1)
+    per_point = dim * 4 + avg_payload
+    return max(MIN_UPLOAD_BATCH_SIZE, min(UPLOAD_BATCH_SIZE, UPLOAD_BATCH_BYTES // per_point))
+
+
+def create_dnsrecon_point(record: Dict[str, Any], vector: np.ndarray, index: int) -> models.PointStruct:
     """Create Qdrant PointStruct - STORES COMPLETE ORIGINAL RECORD."""
     
     # Use integer index as stable ID
     point_id = index
     
     # IDENTIFY record type for better payloads
-    host = record.get("host") or record.get("name") or record.get("domain") or str(index)
-    ip = record.get("address") or record.get("ip") or record.get("ptr") or None
+    host = _first_value(record, _HOST_KEYS, str(index))
+    ip = _first_value(record, _IP_KEYS, None)
     
     # COMPLETE record preserved + indexed fields
     payload = {
@@ -107,20 +183,23 @@ def create_dnsrecon_point(record: Dict[str, Any], dim: int, index: int) -> model
         # Indexed fields for fast filtering/searching
         "host": host,
         "address": ip,
-        "record_type": record.get("type") or record.get("rrtype") or "unknown",
+        "record_type": _first_value(record, _TYPE_KEYS, "unknown"),
         "ttl": record.get("ttl"),
         "source": "dnsrecon",
         "index": index,
-        
-        # Common DNSRecon fields (all optional)
-        **{k: v for k, v in record.items() if k not in ['complete_original_record']}
     }
     
-    print(f"DEBUG: Point {point_id}: host='{host}', keys={len(payload)} fields")
+    # Top-level copies of the few raw fields the console queries filter on;
+    # everything else is only kept once, inside complete_original_record
+    for key in TOP_LEVEL_FIELDS:
+        if key in record:
+            payload[key] = record[key]
+    
+    log.debug("Point %s: host='%s', keys=%d fields", point_id, host, len(payload))
     
     return models.PointStruct(
         id=point_id,
-        vector=make_dnsrecon_vector(dim),
+        vector=vector,
         payload=payload
     )
 
@@ -128,42 +207,71 @@ def create_dnsrecon_point(record: Dict[str, Any], dim: int, index: int) -> model
 def upload_dnsrecon_records(
     client: QdrantClient,
     collection_name: str,
-    records: List[Dict[str, Any]],
+    records: Iterable[Dict[str, Any]],
     dim: int,
     output_json: Optional[str],
-    input_file: str
+    input_file: str,
+    batch_size: Optional[int] = None
 ) -> None:
-    """Upload ALL DNSRecon records as Qdrant points."""
-    print(f"DEBUG: Processing ALL {len(records)} records...")
-    points: List[models.PointStruct] = []
+    """Upload ALL DNSRecon records as Qdrant points, streamed in batches."""
+    log.debug("Processing ALL records...")
+    if not batch_size:
+        # Size batches from the first few records, then put them back in front of the stream
+        records = iter(records)
+        head = list(islice(records, BATCH_SIZE_SAMPLE))
+        batch_size = estimate_batch_size(head, dim)
+        records = chain(head, records)
+    created = 0
     skipped = 0
+    samples: List[models.PointStruct] = []
+    rng = np.random.default_rng()
 
-    for i, record in enumerate(records):
-        try:
-            point = create_dnsrecon_point(record, dim, i)
-            points.append(point)
-        except Exception as e:
-            print(f"Warning: Skipped record {i}: {e}")
-            skipped += 1
-            continue
+    def _gen():
+        nonlocal created, skipped
+        for i, record in enumerate(records):
+            # Dummy vectors are drawn one upload batch at a time
+            offset = i % batch_size
+            if offset == 0:
+                vectors = rng.uniform(-1.0, 1.0, size=(batch_size, dim)).astype(np.float32)
+            try:
+                point = create_dnsrecon_point(record, vectors[offset], i)
+            except Exception as e:
+                print(f"Warning: Skipped record {i}: {e}")
+                skipped += 1
+                continue
+            created += 1
+            if len(samples) < 3:
+                samples.append(point)
+            yield point
 
-    print(f"DEBUG: Created {len(points)} points, skipped {skipped}")
-    
-    if not points:
-        raise ValueError("No valid records to upload")
+    log.debug("Uploading points in batches of %d...", batch_size)
+    try:
+        client.upload_points(
+            collection_name=collection_name,
+            points=_gen(),
+            batch_size=batch_size,
+            parallel=2,
+            wait=True,
+        )
+    finally:
+        # Re-enable HNSW indexing even if the upload failed part way
+        client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD),
+        )
+    log.debug("Created %d points, skipped %d", created, skipped)
 
-    print(f"DEBUG: Uploading {len(points)} points...")
-    result = client.upsert(collection_name=collection_name, points=points, wait=True)
-    print(f"DEBUG: Upsert result: {result}")
+    if not created:
+        raise ValueError("No valid records to upload")
 
-    time.sleep(2)
+    # upload_points(wait=True) has already applied every batch
     count = client.count(collection_name)
     print(f"✓ VERIFIED: {count.count} points uploaded to '{collection_name}'")
 
-    save_upload_report(collection_name, len(points), input_file, output_json)
+    save_upload_report(collection_name, created, input_file, output_json)
 
     print(f"\n🎉 SUCCESS - Sample records:")
-    for p in points[:3]:
+    for p in samples:
         host = p.payload.get('host', 'N/A')
         ip = p.payload.get('address', 'N/A')
         rectype = p.payload.get('record_type', 'N/A')
@@ -177,14 +285,22 @@ def main() -> None:
     )
     
     parser.add_argument("--host", default="localhost", help="Qdrant host")
-    parser.add_argument("--port", type=int, default=6333, help="Qdrant port")
+    parser.add_argument("--port", type=int, default=6333, help="Qdrant REST port")
+    parser.add_argument("--grpc-port", type=int, default=6334, help="Qdrant gRPC port used for the upload")
     parser.add_argument("--output-json", help="Save upload report")
     parser.add_argument("--vector-size", type=int, default=128, help="Vector dimension")
+    parser.add_argument("--batch-size", type=int, help="Points per upload request; sized to about 2 MB when unset")
     parser.add_argument("input_file", help="DNSRecon JSON input file")
     parser.add_argument("collection", nargs="?", default="dnsrecon_results", help="Collection name")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log per-record debug output")
 
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(levelname)s: %(message)s",
+    )
+
     if not os.path.exists(args.input_file):
         print(f"Error: '{args.input_file}' not found", file=sys.stderr)
         sys.exit(1)
@@ -197,12 +313,12 @@ def main() -> None:
         print("=== DNSRecon → Qdrant (COMPLETE IMPORT) ===")
         records = load_dnsrecon_json(args.input_file)
         
-        client = QdrantClient(f"http://{args.host}:{args.port}")
-        print(f"✓ Connected: http://{args.host}:{args.port}")
+        client = QdrantClient(host=args.host, port=args.port, grpc_port=args.grpc_port, prefer_grpc=True)
+        print(f"✓ Connected: {args.host}:{args.grpc_port} (gRPC)")
         
         ensure_collection(client, args.collection, args.vector_size)
         upload_dnsrecon_records(client, args.collection, records, args.vector_size, 
-                              args.output_json, args.input_file)
+                              args.output_json, args.input_file, args.batch_size)
 
         print(f"\n✅ ALL DATA UPLOADED to '{args.collection}'!")
         print(f"   Browse: http://{args.host}:{args.port}/collections/{args.collection}")
@@ -19,6 +19,7 @@ CLI: ingest3r_feroxbuster.py --collection COLLECTION [--vector-size VECTOR_SIZE]
 
 import argparse
 import json
+import logging
 import os
 from typing import List, Dict, Any
 
@@ -29,6 +30,8 @@ DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 6333
 DEFAULT_VECTOR_SIZE = 384
 
+log = logging.getLogger(__name__)
+
 
 def make_dummy_vector(size: int = DEFAULT_VECTOR_SIZE) -> List[float]:
     """Dummy vector for feroxbuster entries."""
@@ -134,7 +137,7 @@ def upload_feroxbuster_to_qdrant(
     for i in range(0, len(points), batch_size):
         batch = points[i:i + batch_size]
         client.upsert(collection_name=collection, points=batch, wait=True)
-        print(f"✓ Uploaded batch {i//batch_size + 1} ({len(batch)} entries)")
+        log.debug("Uploaded batch %d (%d entries)", i // batch_size + 1, len(batch))
 
     print(f"✅ Uploaded {len(points)} feroxbuster entries to '{collection}'")
 
@@ -173,9 +176,19 @@ def main():
         "json_path",
         help="Path to feroxbuster JSON file",
     )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Log every uploaded batch",
+    )
 
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(levelname)s: %(message)s",
+    )
+
     upload_feroxbuster_to_qdrant(
         json_path=args.json_path,
         collection=args.collection,
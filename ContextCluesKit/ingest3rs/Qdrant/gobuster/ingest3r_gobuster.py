@@ -14,6 +14,7 @@ CLI: ingest3r_gobuster.py --collection COLLECTION [--vector-size VECTOR_SIZE] js
 
 import argparse
 import json
+import logging
 import os
 from typing import List, Dict, Any
 
@@ -24,6 +25,8 @@ DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 6333
 DEFAULT_VECTOR_SIZE = 384
 
+log = logging.getLogger(__name__)
+
 
 def make_dummy_vector(size: int = DEFAULT_VECTOR_SIZE) -> List[float]:
     """Dummy vector matching recorded vector_size."""
@@ -114,7 +117,7 @@ def upload_gobuster_json_to_qdrant(
     for i in range(0, len(points), batch_size):
         batch = points[i:i + batch_size]
         client.upsert(collection_name=collection, points=batch, wait=True)
-        print(f"✓ Uploaded batch {i//batch_size + 1} ({len(batch)} entries)")
+        log.debug("Uploaded batch %d (%d entries)", i // batch_size + 1, len(batch))
 
     print(f"✅ Uploaded {len(points)} gobuster entries to '{collection}'")
 
@@ -153,9 +156,19 @@ def main():
         "json_path",
         help="Path to gobuster JSON file (from gobuster_to_json.py)",
     )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Log every uploaded batch",
+    )
 
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(levelname)s: %(message)s",
+    )
+
     upload_gobuster_json_to_qdrant(
         json_path=args.json_path,
         collection=args.collection,
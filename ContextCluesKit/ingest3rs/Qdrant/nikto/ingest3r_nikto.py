@@ -2,29 +2,50 @@
 import json
 import os
 import argparse
-import random
 from typing import List, Dict, Any
 
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import (
+    Distance, VectorParams, HnswConfigDiff, PayloadSchemaType,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ---------------- Configuration ---------------- #
 
 QDRANT_URL = "http://localhost:6333"
+QDRANT_GRPC_PORT = 6334  # bulk upserts go over gRPC (protobuf) instead of REST/JSON
 DEFAULT_VECTOR_SIZE = 384
+UPLOAD_BATCH_SIZE = 512
+UPLOAD_PARALLEL = 4
+PAYLOAD_INDEX_FIELDS = ("method", "path", "reference_url")  # keyword-indexed for filtering
 
 
 # ---------------- Helper functions ---------------- #
 
-def generate_dummy_vector(size: int) -> List[float]:
-    """Generate a dummy vector for each record."""
-    return [random.uniform(-1.0, 1.0) for _ in range(size)]
+def build_vectors(records: List[Dict[str, Any]], size: int) -> np.ndarray:
+    """Stack each record's own vector, or a dummy one if it has none of the right size, into one array."""
+    vectors = np.random.default_rng().uniform(-1.0, 1.0, (len(records), size)).astype(np.float32)
+    for i, record in enumerate(records):
+        record_vector = record.get("vector")
+        if isinstance(record_vector, list) and len(record_vector) == size:
+            vectors[i] = record_vector
+    return vectors
 
 
 def load_json(path: str) -> List[Dict[str, Any]]:
     """Load JSON file and ensure it is a list of dicts."""
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    if orjson is not None:
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
     if isinstance(data, dict):
         data = [data]
@@ -49,8 +70,14 @@ def infer_vector_size_from_records(records: List[Dict[str, Any]]) -> int:
 
 # ---------------- Qdrant upload logic ---------------- #
 
-def create_collection_if_needed(client: QdrantClient, name: str, vector_size: int) -> None:
-    """Create a new collection with given name and vector size (deletes existing)."""
+def create_collection_if_needed(
+    client: QdrantClient, name: str, vector_size: int, placeholder_vectors: bool = False
+) -> None:
+    """Create a new collection with given name and vector size (deletes existing).
+
+    With placeholder_vectors the vectors are kept on disk, no HNSW graph is
+    built and only an int8-quantized copy is held in RAM.
+    """
     if client.collection_exists(name):
         client.delete_collection(name)
 
@@ -59,8 +86,15 @@ def create_collection_if_needed(client: QdrantClient, name: str, vector_size: in
         vectors_config=VectorParams(
             size=vector_size,
             distance=Distance.COSINE,
+            on_disk=placeholder_vectors,
         ),
+        hnsw_config=HnswConfigDiff(m=0, ef_construct=4) if placeholder_vectors else None,
+        quantization_config=ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        ) if placeholder_vectors else None,
     )
+    for field in PAYLOAD_INDEX_FIELDS:
+        client.create_payload_index(name, field_name=field, field_schema=PayloadSchemaType.KEYWORD)
     print(f"✓ Created collection '{name}' with vector size {vector_size}")
 
 
@@ -81,36 +115,36 @@ def upload_json_to_qdrant(
     else:
         print(f"✓ Using specified vector size: {vector_size}")
 
-    client = QdrantClient(url=qdrant_url)
+    client = QdrantClient(url=qdrant_url, grpc_port=QDRANT_GRPC_PORT, prefer_grpc=True)
     print(f"✓ Connected to Qdrant at {qdrant_url}")
 
-    create_collection_if_needed(client, collection_name, vector_size)
-
-    points: List[PointStruct] = []
-    for idx, record in enumerate(records, start=1):
-        point_id = record.get("id", idx)
-        record_vector = record.get("vector")
-
-        if isinstance(record_vector, list) and len(record_vector) == vector_size:
-            vector = record_vector
-        else:
-            vector = generate_dummy_vector(vector_size)
-
-        points.append(
-            PointStruct(
-                id=point_id,
-                vector=vector,
-                payload=record,
-            )
-        )
-
-    op_info = client.upsert(collection_name=collection_name, points=points, wait=True)
-    print(f"✓ Upsert completed: {op_info.status}")
-    print(f"✓ Uploaded {len(points)} points to '{collection_name}'")
+    has_real_vectors = any(
+        isinstance(record.get("vector"), list) and len(record["vector"]) == vector_size
+        for record in records
+    )
+    create_collection_if_needed(client, collection_name, vector_size, placeholder_vectors=not has_real_vectors)
+
+    ids = [record.get("id", idx) for idx, record in enumerate(records, start=1)]
+    vectors = build_vectors(records, vector_size)
+    # Fresh payload dicts without the inline vector, which is already sent as the point vector
+    payloads = [{k: v for k, v in record.items() if k != "vector"} for record in records]
+
+    # One contiguous array instead of a PointStruct per record; the client
+    # batches it and uploads the batches in parallel
+    client.upload_collection(
+        collection_name=collection_name,
+        vectors=vectors,
+        payload=payloads,
+        ids=ids,
+        batch_size=UPLOAD_BATCH_SIZE,
+        parallel=UPLOAD_PARALLEL,
+        wait=True,
+    )
+    print(f"✓ Uploaded {len(records)} points to '{collection_name}'")
 
     print("\nSample payloads:")
-    for p in points[:3]:
-        print(f"  ID={p.id}  payload={p.payload}")
+    for point_id, payload in zip(ids[:3], payloads):
+        print(f"  ID={point_id}  payload={payload}")
 
 
 # ---------------- CLI entrypoint ---------------- #
@@ -2,26 +2,41 @@
 import json
 import os
 import argparse
-import random
+import functools
 import sys
 from typing import List, Dict, Any
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import Distance, VectorParams, PointStruct, FilterSelector, Filter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ---------------- Configuration ---------------- #
 
 DEFAULT_VECTOR_SIZE = 384
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 6333
+DEFAULT_GRPC_PORT = 6334
+GRPC_POOL_SIZE = 16  # concurrent HTTP/2 channels for gRPC upserts
+CLIENT_TIMEOUT = 60
 DEFAULT_COLLECTION_NAME = "Nmap_results"
 
+_RNG = np.random.default_rng()
+
 
 # ---------------- Helper functions ---------------- #
 
 def read_json_file(file_path: str) -> List[Dict[str, Any]]:
     """Read JSON file and return list of records."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    if orjson is not None:
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
     if isinstance(data, dict):
         return [data]
     return data
@@ -29,11 +44,24 @@ def read_json_file(file_path: str) -> List[Dict[str, Any]]:
 
 def create_dummy_vector(size: int) -> List[float]:
     """Generate dummy vector for single-point embedding."""
-    return [random.uniform(-1.0, 1.0) for _ in range(size)]
+    return _RNG.uniform(-1.0, 1.0, size=size).astype(np.float32).tolist()
 
 
 # ---------------- Qdrant upload logic ---------------- #
 
+@functools.lru_cache(maxsize=8)
+def get_client(host: str, port: int) -> QdrantClient:
+    """Return one shared gRPC client per (host, port) for the life of the process."""
+    return QdrantClient(
+        host=host,
+        port=port,
+        grpc_port=DEFAULT_GRPC_PORT,
+        prefer_grpc=True,
+        pool_size=GRPC_POOL_SIZE,
+        timeout=CLIENT_TIMEOUT,
+    )
+
+
 def upload_to_qdrant(
     points: List[PointStruct],
     host: str,
@@ -42,15 +70,25 @@ def upload_to_qdrant(
     vector_size: int,
 ) -> None:
     """Upload points to Qdrant collection with specified vector size."""
-    client = QdrantClient(host=host, port=port)
+    client = get_client(host, port)
     print(f"✓ Connected to Qdrant at {host}:{port}")
 
     try:
-        client.recreate_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
-        )
-        print(f"✓ Collection '{collection_name}' created with vector size {vector_size}")
+        current = None
+        if client.collection_exists(collection_name):
+            current = client.get_collection(collection_name).config.params.vectors
+        if isinstance(current, VectorParams) and current.size == vector_size and current.distance == Distance.COSINE:
+            # Same vector config: drop the old points but keep the collection
+            client.delete(collection_name, points_selector=FilterSelector(filter=Filter()), wait=True)
+            print(f"✓ Collection '{collection_name}' emptied for re-import (vector size {vector_size})")
+        else:
+            if current is not None:
+                client.delete_collection(collection_name)
+            client.create_collection(
+                collection_name=collection_name,
+                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+            )
+            print(f"✓ Collection '{collection_name}' created with vector size {vector_size}")
     except Exception as e:
         print(f"❌ Collection creation failed: {e}")
         return
@@ -74,18 +112,19 @@ def process_json_to_single_vector(
     records = read_json_file(json_file_path)
     print(f"✓ Loaded {len(records)} records from {json_file_path}")
 
-    # Combine all data into single text representation
-    combined_text = ""
+    # Combine all data into single text representation, joined once at the end
+    chunks = []
     payloads = []
     
     for i, record in enumerate(records):
+        # The text form lives only in combined_content; each record is shipped as structured data
         record_text = json.dumps(record, ensure_ascii=False, indent=2)
-        combined_text += f"\n--- Record {i+1} ---\n{record_text}\n"
+        chunks.append(f"\n--- Record {i+1} ---\n{record_text}\n")
         payloads.append({
             "id": i,
-            "content": record_text,
             "original_data": record
         })
+    combined_text = "".join(chunks)
     
     print(f"✓ Combined text length: {len(combined_text)} characters")
 
@@ -2,25 +2,74 @@
 import json
 import os
 import argparse
-import random
+import functools
+import itertools
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import (
+    Distance, VectorParams, OptimizersConfigDiff, Datatype,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, FilterSelector, Filter,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # ---------------- Configuration ---------------- #
 DEFAULT_VECTOR_SIZE = 384
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 6333
+DEFAULT_GRPC_PORT = 6334
+GRPC_POOL_SIZE = 16  # concurrent HTTP/2 channels for gRPC upserts
+CLIENT_TIMEOUT = 60
 DEFAULT_COLLECTION_NAME = "nuclei_entries"
+UPLOAD_BATCH_SIZE = 256
+UPLOAD_PARALLEL = min(8, os.cpu_count() or 1)
+INDEXING_THRESHOLD = 20000  # Qdrant's default, restored when the upload ends
+
+_RNG = np.random.default_rng()
 
 # ---------------- Helper functions ---------------- #
 
-def read_nuclei_json(file_path: str) -> List[Dict[str, Any]]:
-    """Read Nuclei JSON file and return list of entries."""
+def _starts_with_array(path: str) -> bool:
+    """Peek at the first non-whitespace byte to see if the JSON root is an array."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return False
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped.startswith(b'[')
+
+def _stream_entries(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the entries of a top-level JSON array one at a time."""
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+def read_nuclei_json(file_path: str) -> Iterable[Dict[str, Any]]:
+    """Read Nuclei JSON file and return its entries.
+
+    A top-level array is streamed entry by entry when ijson is installed,
+    so memory stays bounded by the upload batch instead of the file size.
+    """
+    if ijson is not None and _starts_with_array(file_path):
+        return _stream_entries(file_path)
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if orjson is not None:
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         if isinstance(data, dict):
             return [data]
         return data
@@ -28,88 +77,158 @@ def read_nuclei_json(file_path: str) -> List[Dict[str, Any]]:
         print(f"❌ Error reading JSON: {e}")
         sys.exit(1)
 
-def create_dummy_vector(size: int) -> List[float]:
-    """Generate unique dummy vector for each entry."""
-    random.seed()  # Ensure unique randomness per call
-    return [random.uniform(-1.0, 1.0) for _ in range(size)]
+def create_dummy_vectors(count: int, size: int) -> np.ndarray:
+    """Generate one unique dummy vector per entry in a single call."""
+    # Drawn straight into float32 (no float64 intermediate); Gaussian rows also
+    # point in uniformly random directions, which is what cosine distance sees
+    return _RNG.standard_normal((count, size), dtype=np.float32)
+
+# Type-specific payload fields; entries missing a field get None for it
+_PAYLOAD_FIELDS = {
+    "finding": ("template", "protocol", "severity", "target", "extra_info"),
+    "log": ("log_level", "message"),
+}
+
+def entry_payload(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the Qdrant payload for one finding or log entry."""
+    entry_type = entry["entry_type"]
+    payload = {
+        "entry_id": entry["id"],
+        "entry_type": entry_type,
+        "scan_tool": "nuclei"
+    }
+    
+    # Add finding- or log-specific fields; map/zip keep the lookups in C
+    fields = _PAYLOAD_FIELDS.get(entry_type)
+    if fields:
+        payload.update(zip(fields, map(entry.get, fields)))
+    
+    return payload
 
 # ---------------- Qdrant upload logic ---------------- #
 
+@functools.lru_cache(maxsize=8)
+def get_client(host: str, port: int) -> QdrantClient:
+    """Return one shared gRPC client per (host, port) for the life of the process."""
+    return QdrantClient(
+        host=host,
+        port=port,
+        grpc_port=DEFAULT_GRPC_PORT,
+        prefer_grpc=True,
+        pool_size=GRPC_POOL_SIZE,
+        timeout=CLIENT_TIMEOUT,
+    )
+
+
+def reset_collection(client: QdrantClient, collection_name: str, vector_size: int) -> bool:
+    """Make an empty collection for the upload; returns True if an existing one was reused.
+
+    A collection with the same vector size, distance and datatype only has its
+    points deleted, keeping its segments and config instead of dropping it.
+    """
+    vectors_config = VectorParams(size=vector_size, distance=Distance.COSINE, datatype=Datatype.FLOAT16)
+    # No HNSW indexing while the bulk upload is running
+    bulk_optimizers = OptimizersConfigDiff(indexing_threshold=0)
+
+    if client.collection_exists(collection_name):
+        current = client.get_collection(collection_name).config.params.vectors
+        if (
+            isinstance(current, VectorParams)
+            and current.size == vector_size
+            and current.distance == Distance.COSINE
+            and current.datatype == Datatype.FLOAT16
+        ):
+            client.delete(
+                collection_name=collection_name,
+                points_selector=FilterSelector(filter=Filter()),
+                wait=True,
+            )
+            client.update_collection(collection_name=collection_name, optimizers_config=bulk_optimizers)
+            return True
+        client.delete_collection(collection_name)
+
+    client.create_collection(
+        collection_name=collection_name,
+        # float16 storage plus an int8 copy in RAM: half and a quarter of float32
+        vectors_config=vectors_config,
+        quantization_config=ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        ),
+        optimizers_config=bulk_optimizers,
+    )
+    return False
+
+
 def upload_nuclei_json_to_qdrant(
-    entries: List[Dict[str, Any]],
+    entries: Iterable[Dict[str, Any]],
     collection_name: str,
     vector_size: int,
     host: str,
     port: int
 ) -> None:
     """Upload each JSON entry as individual Qdrant point."""
-    client = QdrantClient(host=host, port=port)
+    client = get_client(host, port)
     print(f"✓ Connected to Qdrant at {host}:{port}")
 
-    # Create/recreate collection
+    # Create the collection, or empty it when its vector config already matches
     try:
-        client.recreate_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
-        )
-        print(f"✓ Collection '{collection_name}' created (vector_size={vector_size})")
+        if reset_collection(client, collection_name, vector_size):
+            print(f"✓ Collection '{collection_name}' emptied for re-import (vector_size={vector_size})")
+        else:
+            print(f"✓ Collection '{collection_name}' created (vector_size={vector_size})")
     except Exception as e:
         print(f"❌ Collection creation failed: {e}")
         return
 
-    # Convert each entry to Qdrant PointStruct
-    points = []
-    for entry in entries:
-        entry_id = entry["id"]
-        
-        # Create unique vector for this entry
-        vector = create_dummy_vector(vector_size)
-        
-        # Build complete payload from entry
-        payload = {
-            "entry_id": entry["id"],
-            "entry_type": entry["entry_type"],
-            "scan_tool": "nuclei"
-        }
-        
-        # Add finding-specific fields
-        if entry["entry_type"] == "finding":
-            payload.update({
-                "template": entry.get("template"),
-                "protocol": entry.get("protocol"),
-                "severity": entry.get("severity"),
-                "target": entry.get("target"),
-                "extra_info": entry.get("extra_info")
-            })
-        
-        # Add log-specific fields
-        elif entry["entry_type"] == "log":
-            payload.update({
-                "log_level": entry.get("log_level"),
-                "message": entry.get("message")
-            })
-        
-        # Create PointStruct
-        point = PointStruct(
-            id=entry_id,  # Use original entry ID
-            vector=vector,
-            payload=payload
-        )
-        points.append(point)
+    total = 0
+    findings_count = 0
+
+    # upload_collection takes parallel ids/vectors/payloads and batches them
+    # itself, so no PointStruct is built per entry; tee() shares the entry
+    # stream between the id and payload iterators, which zip consumes in
+    # lockstep, keeping the upload streaming
+    id_entries, payload_entries = itertools.tee(entries)
+
+    def _ids() -> Iterator[Any]:
+        nonlocal total, findings_count
+        for entry in id_entries:
+            total += 1
+            if entry["entry_type"] == "finding":
+                findings_count += 1
+            yield entry["id"]  # Use original entry ID
 
-    # Batch upload all points
-    client.upsert(collection_name=collection_name, points=points, wait=True)
+    def _vectors() -> Iterator[List[float]]:
+        # Dummy vectors are drawn one batch at a time; zip stops at the last id
+        while True:
+            yield from create_dummy_vectors(UPLOAD_BATCH_SIZE, vector_size).tolist()
+
+    # Batched upload spread over worker processes
+    try:
+        client.upload_collection(
+            collection_name=collection_name,
+            ids=_ids(),
+            vectors=_vectors(),
+            payload=map(entry_payload, payload_entries),
+            batch_size=UPLOAD_BATCH_SIZE,
+            parallel=UPLOAD_PARALLEL,
+            wait=True,
+        )
+    finally:
+        # Re-enable HNSW indexing even if the upload failed part way
+        client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD),
+        )
     
     # Verify upload
     count = client.count(collection_name=collection_name)
-    findings_count = len([e for e in entries if e["entry_type"] == "finding"])
     
     print(f"🎉 SUCCESS!")
-    print(f"   Total points: {len(points)}")
+    print(f"   Total points: {total}")
     print(f"   Findings: {findings_count}")
-    print(f"   Logs: {len(entries) - findings_count}")
+    print(f"   Logs: {total - findings_count}")
     print(f"   Qdrant verified: {count.count}")
-    
+
     # Show sample points
     sample = client.scroll(collection_name=collection_name, limit=3, with_payload=True)
     print(f"✅ Sample point IDs: {[p.id for p in sample.points]}")
@@ -152,13 +271,9 @@ def main():
         sys.exit(1)
     
     try:
-        # Read JSON
+        # Read JSON (streamed when possible); findings/logs are counted during upload
         entries = read_nuclei_json(args.json_file)
-        print(f"✓ Loaded {len(entries)} entries from '{args.json_file}'")
-        
-        # Count findings vs logs
-        findings = len([e for e in entries if e["entry_type"] == "finding"])
-        print(f"✓ Findings: {findings}, Logs: {len(entries) - findings}")
+        print(f"✓ Reading entries from '{args.json_file}'")
         
         # Upload to Qdrant
         upload_nuclei_json_to_qdrant(
@@ -1,14 +1,15 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import logging
 import os
 import sys
+from itertools import islice
 from pathlib import Path
 from qdrant_client import QdrantClient
 from qdrant_client.http.models import Distance, VectorParams, PointStruct
 import numpy as np
-import random
-from typing import List, Dict, Any
+from typing import Dict, Any
 
 # ---------------- Configuration ---------------- #
 DEFAULT_VECTOR_SIZE = 384
@@ -16,19 +17,23 @@ DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 6333
 DEFAULT_COLLECTION_NAME = "sslscan_results"
 
-def create_simple_embedding(text: str, dim: int = 128) -> List[float]:
+log = logging.getLogger(__name__)
+
+_RNG = np.random.default_rng()
+_WEAK_PROTOCOLS = frozenset(("SSLv2", "SSLv3", "TLSv1.0", "TLSv1.1"))  # counted when enabled
+
+def create_simple_embedding(text: str, dim: int = 128) -> np.ndarray:
     """Simple hash-based embedding for demo purposes."""
-    vec = np.zeros(dim)
-    for i, char in enumerate(text.lower()):
-        if i >= dim:
-            break
-        vec[i] = (ord(char) % 256) / 255.0
+    # Code points of the first dim characters, read in one go as UTF-32 words
+    codes = np.frombuffer(text.lower()[:dim].encode("utf-32-le"), dtype=np.uint32)
+    vec = np.zeros(dim, dtype=np.float32)
+    vec[:len(codes)] = (codes % 256) / 255.0
     
     # Add slight random noise for unique vectors
-    vec += np.random.normal(0, 0.01, dim)
-    vec = np.clip(vec, -1.0, 1.0)
+    vec += _RNG.standard_normal(dim, dtype=np.float32) * 0.01
+    np.clip(vec, -1.0, 1.0, out=vec)
     
-    return vec.tolist()
+    return vec
 
 def upload_sslscan_to_qdrant(
     json_file: str, 
@@ -81,14 +86,13 @@ def upload_sslscan_to_qdrant(
         print(f"❌ Collection creation failed: {e}")
         return
     
-    # Prepare points for upload
-    points = []
-    
-    for entry in sslscan_data:
-        entry_id = entry.get("id", len(points) + 1)
+    # Points are built lazily, so only one upload batch of them is held at a time
+    def make_point(index: int, entry: Dict[str, Any]) -> PointStruct:
+        entry_id = entry.get("id", index)
         
         # Create comprehensive text summary for embedding
-        protocols = list(entry.get('protocols', {}).keys()) if entry.get('protocols') else []
+        protos = entry.get('protocols') or {}
+        protocols = list(protos)
         ciphers_count = len(entry.get('ciphers', []))
         cert = entry.get('certificate', {})
         subject = cert.get('subject', 'N/A')
@@ -114,8 +118,7 @@ def upload_sslscan_to_qdrant(
             "sni": entry.get("sni"),
             "protocols": entry.get("protocols", {}),
             "ciphers_count": ciphers_count,
-            "weak_protocols_count": sum(1 for k, v in entry.get("protocols", {}).items() 
-                                      if v == "enabled" and any(weak in k for weak in ["TLSv1.0", "TLSv1.1"])),
+            "weak_protocols_count": sum(1 for k, v in protos.items() if v == "enabled" and k in _WEAK_PROTOCOLS),
             "certificate_subject": subject,
             "certificate_issuer": cert.get("issuer"),
             "certificate_altnames_count": len(cert.get("altnames", [])),
@@ -123,24 +126,28 @@ def upload_sslscan_to_qdrant(
             **cert  # Include full certificate data
         }
         
-        point = PointStruct(
+        return PointStruct(
             id=entry_id,
             vector=vector,
             payload=payload
         )
-        points.append(point)
+    
+    points = (make_point(i, entry) for i, entry in enumerate(sslscan_data, start=1))
     
     # Upload in batches
     batch_size = 50
-    for i in range(0, len(points), batch_size):
-        batch = points[i:i + batch_size]
+    total = 0
+    batch_number = 0
+    while batch := list(islice(points, batch_size)):
+        batch_number += 1
         client.upsert(collection_name=collection_name, points=batch, wait=True)
-        print(f"✓ Uploaded batch {i//batch_size + 1} ({len(batch)} points)")
+        total += len(batch)
+        log.debug("Uploaded batch %d (%d points)", batch_number, len(batch))
     
     # Verify upload
     count = client.count(collection_name=collection_name)
     print(f"\n🎉 SUCCESS!")
-    print(f"   Total points: {len(points)}")
+    print(f"   Total points: {total}")
     print(f"   Collection: '{collection_name}'")
     print(f"   Vector size: {vector_size}")
     print(f"   Qdrant verified: {count.count}")
@@ -182,9 +189,19 @@ def main():
         default=DEFAULT_VECTOR_SIZE,
         help=f"Vector dimension size (default: {DEFAULT_VECTOR_SIZE})"
     )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Log every uploaded batch"
+    )
     
     args = parser.parse_args()
     
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(levelname)s: %(message)s",
+    )
+    
     upload_sslscan_to_qdrant(
         json_file=args.json_file,
         collection_name=args.collection,
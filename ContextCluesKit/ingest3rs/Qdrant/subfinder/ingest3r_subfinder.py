@@ -1,24 +1,129 @@
 #!/usr/bin/env python3
 import argparse
+import functools
+import hashlib
 import json
 import os
+import sqlite3
 import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 import numpy as np
 from qdrant_client import QdrantClient, models
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
 # ---------------- Configuration ---------------- #
 DEFAULT_VECTOR_SIZE = 384
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 6333
+DEFAULT_GRPC_PORT = 6334
+GRPC_POOL_SIZE = 16  # concurrent HTTP/2 channels for gRPC upserts
+CLIENT_TIMEOUT = 60
 DEFAULT_COLLECTION_NAME = "Subfinder_json"
+UPLOAD_BATCH_SIZE = 256
+UPLOAD_PARALLEL = min(8, os.cpu_count() or 1)
+INDEXING_THRESHOLD = 20000  # Qdrant's default, restored when the upload ends
+EMBED_BATCH_SIZE = 1024  # sentence-transformers sorts each call's texts by length into batches of this size
+_LIST_KEYS = ("items", "data", "records")  # wrapper keys holding the item list
+_TEXT_KEYS = ("text", "content", "#text")  # tried in order for an item's text
+
+@functools.lru_cache(maxsize=4)
+def get_model(model_name: str):
+    """Load a SentenceTransformer model once per process and reuse it on later calls."""
+    return SentenceTransformer(model_name)
 
-def embed_text(text: str, vector_size: int = DEFAULT_VECTOR_SIZE) -> List[float]:
+def embed_text(text: str, vector_size: int = DEFAULT_VECTOR_SIZE) -> np.ndarray:
     """Dummy embedding function - replace with real embedding model."""
-    rng = np.random.default_rng(abs(hash(text)) % (2**32))
-    vec = rng.random(vector_size)
-    return vec.astype(float).tolist()
+    # blake2b rather than hash(), which is salted per process, so a text maps to the same vector every run
+    seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+    rng = np.random.default_rng(seed)
+    return rng.random(vector_size, dtype=np.float32)
+
+def open_embedding_cache(path: str) -> sqlite3.Connection:
+    """Open (creating if needed) the sqlite cache of text embeddings."""
+    cache = sqlite3.connect(path)
+    cache.execute("CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, emb BLOB)")
+    return cache
+
+def text_hash(text: str, space: str) -> bytes:
+    """Cache key for a text: blake2b of the embedding space (model and size) and the text."""
+    return hashlib.blake2b(f"{space}\0{text}".encode(), digest_size=16).digest()
+
+def encode_texts(texts: List[str], vector_size: int, model=None) -> np.ndarray:
+    """Embed texts with one model.encode call, or with the dummy embed_text without a model."""
+    if model is None:
+        return np.stack([embed_text(text, vector_size) for text in texts])
+    return model.encode(
+        texts,
+        batch_size=EMBED_BATCH_SIZE,
+        show_progress_bar=len(texts) > EMBED_BATCH_SIZE,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    ).astype(np.float32)
+
+def embed_texts(
+    texts: List[str], vector_size: int, model=None, model_name: str = None,
+    cache: sqlite3.Connection = None
+) -> Tuple[np.ndarray, int]:
+    """Embed texts into one float32 array, reusing cached vectors when a cache is given.
+
+    Returns the array and how many of the texts were actually encoded.
+    """
+    if cache is None:
+        return encode_texts(texts, vector_size, model), len(texts)
+
+    space = f"{model_name or 'dummy'}:{vector_size}"
+    hashes = [text_hash(text, space) for text in texts]
+    cached = {}
+    # Stay under sqlite's bound-parameter limit
+    for i in range(0, len(hashes), 500):
+        chunk = hashes[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        cached.update(
+            (key, np.frombuffer(emb, dtype=np.float32))
+            for key, emb in cache.execute(f"SELECT hash, emb FROM embeddings WHERE hash IN ({placeholders})", chunk)
+        )
+
+    missing = [i for i, key in enumerate(hashes) if key not in cached]
+    if missing:
+        encoded = encode_texts([texts[i] for i in missing], vector_size, model)
+        rows = []
+        for i, vec in zip(missing, encoded):
+            cached[hashes[i]] = vec
+            rows.append((hashes[i], vec.tobytes()))
+        cache.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?)", rows)
+        cache.commit()
+
+    return np.stack([cached[key] for key in hashes]), len(missing)
+
+def stream_embeddings(
+    texts: List[str], vector_size: int, model=None, model_name: str = None,
+    cache: sqlite3.Connection = None
+) -> Iterator[List[float]]:
+    """Yield one vector per text, embedding EMBED_BATCH_SIZE texts at a time.
+
+    upload_collection pulls from this lazily, so with parallel upload workers
+    the next chunk is embedded while the previous batches are being sent.
+    """
+    computed = 0
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        vectors, encoded = embed_texts(
+            texts[start:start + EMBED_BATCH_SIZE], vector_size, model, model_name, cache
+        )
+        computed += encoded
+        # Report before the last yield: upload_collection stops pulling once the ids run out
+        if cache is not None and start + EMBED_BATCH_SIZE >= len(texts):
+            print(f"✓ Embedding cache: {len(texts) - computed} hits, {computed} computed")
+        yield from vectors.tolist()
 
 def load_json(path: str) -> List[Dict[str, Any]]:
     """Load JSON file with error handling."""
@@ -27,8 +132,11 @@ def load_json(path: str) -> List[Dict[str, Any]]:
         raise FileNotFoundError(f"❌ JSON file not found: {p}")
     
     try:
-        with p.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+        if orjson is not None:
+            data = orjson.loads(p.read_bytes())
+        else:
+            with p.open("r", encoding="utf-8") as f:
+                data = json.load(f)
     except Exception as e:
         raise ValueError(f"❌ Error reading JSON: {e}")
     
@@ -39,21 +147,30 @@ def load_json(path: str) -> List[Dict[str, Any]]:
         # Try common patterns
         if "magictree" in data and "testdata" in data["magictree"]:
             items = data["magictree"]["testdata"].get("host", [])
-        elif any(key in data for key in ["items", "data", "records"]):
-            for key in ["items", "data", "records"]:
-                if key in data and isinstance(data[key], list):
-                    items = data[key]
-                    break
-            else:
-                items = [data]
         else:
-            items = [data]
+            # First list under a known wrapper key, else the object itself
+            items = next(
+                (data[key] for key in _LIST_KEYS if isinstance(data.get(key), list)),
+                [data]
+            )
     else:
         raise ValueError(f"❌ Unsupported JSON root type: {type(data)}")
     
     print(f"✓ Loaded {len(items)} items from '{path}'")
     return items
 
+@functools.lru_cache(maxsize=8)
+def get_client(host: str, port: int) -> QdrantClient:
+    """Return one shared gRPC client per (host, port) for the life of the process."""
+    return QdrantClient(
+        host=host,
+        port=port,
+        grpc_port=DEFAULT_GRPC_PORT,
+        prefer_grpc=True,
+        pool_size=GRPC_POOL_SIZE,
+        timeout=CLIENT_TIMEOUT,
+    )
+
 def ensure_collection(client: QdrantClient, collection_name: str, vector_size: int):
     """Create/recreate collection."""
     try:
@@ -67,7 +184,17 @@ def ensure_collection(client: QdrantClient, collection_name: str, vector_size: i
             vectors_config=models.VectorParams(
                 size=vector_size,
                 distance=models.Distance.COSINE,
+                datatype=models.Datatype.FLOAT16,
+            ),
+            # int8 copy kept in RAM for search; with real embeddings the
+            # float16 originals rescore the top hits
+            quantization_config=models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+                )
             ),
+            # No HNSW indexing while the bulk upload is running
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
         )
     except Exception as e:
         print(f"❌ Collection creation failed: {e}")
@@ -78,13 +205,19 @@ def upload_json_to_qdrant(
     collection_name: str,
     host: str = DEFAULT_HOST,
     port: int = DEFAULT_PORT,
-    vector_size: int = DEFAULT_VECTOR_SIZE
+    vector_size: int = DEFAULT_VECTOR_SIZE,
+    embed_cache: str = None,
+    model_name: str = None
 ):
-    """Main function: read JSON and upload to Qdrant."""
+    """Main function: read JSON and upload to Qdrant.
+
+    With model_name the items are embedded by that SentenceTransformer model
+    and the collection takes the model's dimension instead of vector_size.
+    """
     
     # Connect to Qdrant
     try:
-        client = QdrantClient(host=host, port=port)
+        client = get_client(host, port)
         print(f"✓ Connected to Qdrant at {host}:{port}")
     except Exception as e:
         print(f"❌ Cannot connect to Qdrant at {host}:{port}: {e}")
@@ -102,22 +235,31 @@ def upload_json_to_qdrant(
         print("❌ No valid items to process!")
         return
     
+    model = None
+    if model_name:
+        if SentenceTransformer is None:
+            print("❌ --model needs sentence-transformers: pip install sentence-transformers")
+            return
+        model = get_model(model_name)
+        vector_size = model.get_sentence_embedding_dimension()
+        print(f"✓ Loaded embedding model '{model_name}' (dim={vector_size})")
+    
     # Ensure collection exists
     try:
         ensure_collection(client, collection_name, vector_size)
     except Exception as e:
         return
     
-    # Create points
-    points = []
+    # Parallel ids/texts/payloads for upload_collection
+    ids = []
+    texts = []
+    payloads = []
     skipped = 0
     
     for idx, item in enumerate(items, 1):
         # Flexible text extraction
         text = (
-            item.get("text") or
-            item.get("content") or
-            item.get("#text") or
+            next(filter(None, map(item.get, _TEXT_KEYS)), None) or
             f"{item.get('Hostname', '')} {item.get('ip', '')}".strip() or
             f"{item.get('hostname', '')} {item.get('IP', item.get('#text', ''))}".strip() or
             str(item)
@@ -128,7 +270,6 @@ def upload_json_to_qdrant(
             skipped += 1
             continue
         
-        vector = embed_text(text, vector_size)
         point_id = item.get("id", idx)
         
         # FIXED: Clean payload - no scan_tool, original_id → id
@@ -137,40 +278,47 @@ def upload_json_to_qdrant(
             **{k: v for k, v in item.items() if k not in ("id", "vector", "text")}
         }
         
-        points.append(
-            models.PointStruct(
-                id=point_id,
-                vector=vector,
-                payload=payload,
-            )
-        )
+        ids.append(point_id)
+        texts.append(text)
+        payloads.append(payload)
     
-    if not points:
+    if not ids:
         print("❌ No valid points to upload!")
         return
     
-    print(f"✓ Prepared {len(points)} points (skipped {skipped})")
-    
-    # Upload with batching
-    batch_size = 100
-    for i in range(0, len(points), batch_size):
-        batch = points[i:i + batch_size]
-        try:
-            client.upsert(
-                collection_name=collection_name,
-                points=batch,
-                wait=True,
-            )
-            print(f"✓ Uploaded batch {i//batch_size + 1} ({len(batch)} points)")
-        except Exception as e:
-            print(f"❌ Batch upload failed: {e}")
-            return
+    print(f"✓ Prepared {len(ids)} points (skipped {skipped})")
+    
+    cache = open_embedding_cache(embed_cache) if embed_cache else None
+    
+    # Batched upload spread over worker processes, embedding as it goes
+    try:
+        client.upload_collection(
+            collection_name=collection_name,
+            ids=ids,
+            vectors=stream_embeddings(texts, vector_size, model, model_name, cache),
+            payload=payloads,
+            batch_size=UPLOAD_BATCH_SIZE,
+            parallel=UPLOAD_PARALLEL,
+            wait=True,
+        )
+        print(f"✓ Uploaded {len(ids)} points in batches of {UPLOAD_BATCH_SIZE}")
+    except Exception as e:
+        print(f"❌ Batch upload failed: {e}")
+        return
+    finally:
+        # Re-enable HNSW indexing even if the upload failed part way
+        client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD),
+        )
+        if cache is not None:
+            cache.close()
     
     # Verify upload
     try:
         count = client.count(collection_name=collection_name)
         print(f"\n🎉 SUCCESS!")
-        print(f"   Total points: {len(points)}")
+        print(f"   Total points: {len(ids)}")
         print(f"   Collection: '{collection_name}'")
         print(f"   Vector size: {vector_size}")
         print(f"   Qdrant verified: {count.count}")
@@ -213,6 +361,16 @@ def main():
         default=DEFAULT_VECTOR_SIZE,
         help=f"Vector dimension size (default: {DEFAULT_VECTOR_SIZE})"
     )
+    parser.add_argument(
+        "--embed-cache",
+        metavar="PATH",
+        help="SQLite file caching embeddings by text hash, so re-ingesting unchanged items skips embedding"
+    )
+    parser.add_argument(
+        "--model",
+        metavar="NAME",
+        help="SentenceTransformer model for real embeddings, e.g. all-MiniLM-L6-v2 (default: dummy vectors)"
+    )
     
     args = parser.parse_args()
     
@@ -221,7 +379,9 @@ def main():
         collection_name=args.collection,
         host=args.host,
         port=args.port,
-        vector_size=args.vector_size
+        vector_size=args.vector_size,
+        embed_cache=args.embed_cache,
+        model_name=args.model
     )
 
 if __name__ == "__main__":
@@ -1,26 +1,88 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import mmap
 import os
 import sys
-import random
-from typing import List, Dict, Any
+from itertools import chain
+from typing import Dict, Any, Iterable, Iterator
+import numpy as np
 from qdrant_client import QdrantClient, models
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # ---------------- Configuration ---------------- #
 DEFAULT_VECTOR_SIZE = 384
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 6333
+DEFAULT_GRPC_PORT = 6334
+GRPC_POOL_SIZE = 16  # concurrent HTTP/2 channels for gRPC upserts
+CLIENT_TIMEOUT = 60
 DEFAULT_COLLECTION_NAME = "subdomains"
+UPLOAD_BATCH_SIZE = 64
+UPLOAD_PARALLEL = min(8, os.cpu_count() or 1)
+INDEXING_THRESHOLD = 20000  # Qdrant's default, restored when the upload ends
+MMAP_THRESHOLD = 64 * 1024 * 1024  # JSON files at least this big are memory-mapped
+_SKIP_KEYS = frozenset(("id", "vector", "text"))  # entry keys left out of the payload
+
+def _orjson_load(path: str) -> Any:
+    """Parse a JSON file with orjson; large files are memory-mapped instead of read into a copy."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def _starts_with_array(path: str) -> bool:
+    """Peek at the first non-whitespace byte to see if the JSON root is an array."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return False
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped.startswith(b'[')
+
+def _stream_domains(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the entries of a top-level JSON array one at a time."""
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
 
-def load_subdomains_json(path: str) -> List[Dict[str, Any]]:
-    """Load subdomains JSON file."""
+def load_subdomains_json(path: str) -> Iterable[Dict[str, Any]]:
+    """Load subdomains JSON file.
+
+    A top-level array is streamed entry by entry when ijson is installed,
+    so memory stays bounded by one upload batch instead of the file size.
+    The first entry is parsed here, so an unreadable file fails before the
+    collection is touched; a file that breaks off later still fails part
+    way through the upload.
+    """
     if not os.path.exists(path):
         raise FileNotFoundError(f"❌ JSON file not found: {path}")
     
+    if ijson is not None and _starts_with_array(path):
+        domains = _stream_domains(path)
+        try:
+            first = next(domains, None)
+        except Exception as e:
+            raise ValueError(f"❌ Error reading JSON: {e}")
+        return [] if first is None else chain((first,), domains)
+    
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if orjson is not None:
+            data = _orjson_load(path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
     except Exception as e:
         raise ValueError(f"❌ Error reading JSON: {e}")
     
@@ -34,15 +96,32 @@ def load_subdomains_json(path: str) -> List[Dict[str, Any]]:
     print(f"✓ Loaded {len(data)} domains from '{path}'")
     return data
 
-def make_dummy_vector(dim: int = DEFAULT_VECTOR_SIZE) -> List[float]:
-    """Dummy vector (replace with sentence-transformer embeddings later)."""
-    return [random.uniform(-1.0, 1.0) for _ in range(dim)]
+def make_dummy_vectors(count: int, dim: int = DEFAULT_VECTOR_SIZE) -> np.ndarray:
+    """Dummy vectors, one row per domain, drawn in one call (replace with sentence-transformer embeddings later)."""
+    return np.random.default_rng().uniform(-1.0, 1.0, size=(count, dim)).astype(np.float32)
 
 def ensure_collection(client: QdrantClient, collection_name: str, dim: int):
-    """Create/recreate collection."""
+    """Create the collection, or empty an existing one with the same vector config."""
+    # No HNSW indexing while the bulk upload is running
+    bulk_optimizers = models.OptimizersConfigDiff(indexing_threshold=0)
     try:
         if client.collection_exists(collection_name):
-            print(f"Collection '{collection_name}' exists. Recreating...")
+            current = client.get_collection(collection_name).config.params.vectors
+            if (
+                isinstance(current, models.VectorParams)
+                and current.size == dim
+                and current.distance == models.Distance.COSINE
+            ):
+                # Same vector config: drop the old points but keep the collection
+                client.delete(
+                    collection_name,
+                    points_selector=models.FilterSelector(filter=models.Filter()),
+                    wait=True,
+                )
+                client.update_collection(collection_name=collection_name, optimizers_config=bulk_optimizers)
+                print(f"✓ Collection '{collection_name}' emptied for re-import (vector_size={dim})")
+                return True
+            print(f"Collection '{collection_name}' exists with another vector config. Recreating...")
             client.delete_collection(collection_name)
         
         print(f"✓ Creating collection '{collection_name}' (vector_size={dim})")
@@ -51,7 +130,10 @@ def ensure_collection(client: QdrantClient, collection_name: str, dim: int):
             vectors_config=models.VectorParams(
                 size=dim,
                 distance=models.Distance.COSINE,
+                # Memmapped vectors keep large ingests from being bounded by RAM
+                on_disk=True,
             ),
+            optimizers_config=bulk_optimizers,
         )
         return True
     except Exception as e:
@@ -61,59 +143,68 @@ def ensure_collection(client: QdrantClient, collection_name: str, dim: int):
 def upload_subdomains(
     client: QdrantClient,
     collection_name: str,
-    domains: List[Dict[str, Any]],
+    domains: Iterable[Dict[str, Any]],
     dim: int,
+    batch_size: int = UPLOAD_BATCH_SIZE,
+    parallel: int = UPLOAD_PARALLEL,
 ):
-    """Upload subdomains as Qdrant points."""
-    points = []
+    """Upload subdomains as Qdrant points in parallel batches."""
+    print(f"✓ Uploading with batch_size={batch_size}, concurrency={parallel}")
+    uploaded = 0
     skipped = 0
     
-    for domain_entry in domains:
-        # Use 'id' field or generate from line_number/index
-        point_id = domain_entry.get("id") or domain_entry.get("line_number")
-        if not point_id:
-            skipped += 1
-            continue
-        
-        # FIXED: Clean payload - no scan_tool, original_id → id
-        payload = {
-            "id": point_id,  # Changed from original_id pattern
-            "domain": domain_entry.get("domain"),
-            "raw_line": domain_entry.get("raw_line", ""),
-            "line_number": domain_entry.get("line_number"),
-            **{k: v for k, v in domain_entry.items() if k not in ("id", "vector", "text")}
-        }
-        
-        points.append(
-            models.PointStruct(
-                id=point_id,
-                vector=make_dummy_vector(dim),
-                payload=payload,
-            )
+    def iter_points() -> Iterator[models.PointStruct]:
+        # Consumed lazily by upload_points, so domains stream straight into the upload
+        nonlocal uploaded, skipped
+        for domain_entry in domains:
+            # Use 'id' field or generate from line_number/index
+            point_id = domain_entry.get("id") or domain_entry.get("line_number")
+            if not point_id:
+                skipped += 1
+                continue
+            
+            # FIXED: Clean payload - no scan_tool, original_id → id
+            payload = {k: v for k, v in domain_entry.items() if k not in _SKIP_KEYS}
+            payload["id"] = point_id  # Changed from original_id pattern
+            payload.setdefault("domain", None)
+            payload.setdefault("raw_line", "")
+            payload.setdefault("line_number", None)
+            
+            # Dummy vectors are drawn one batch at a time
+            if uploaded % batch_size == 0:
+                dummies = make_dummy_vectors(batch_size, dim)
+            vector = dummies[uploaded % batch_size]  # float32 row; PointStruct serializes it
+            uploaded += 1
+            yield models.PointStruct(id=point_id, vector=vector, payload=payload)
+    
+    try:
+        # Batches are acknowledged once they reach the WAL, so requests go out
+        # back to back instead of waiting on each flush; readers may briefly
+        # miss points while Qdrant applies them
+        client.upload_points(
+            collection_name=collection_name,
+            points=iter_points(),
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=False,
+        )
+        # One exact count as the sync call at the end of the load
+        client.count(collection_name=collection_name, exact=True)
+    except Exception as e:
+        print(f"❌ Batch upload failed: {e}")
+        return
+    finally:
+        # Re-enable HNSW indexing even if the upload failed part way
+        client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD),
         )
     
-    if not points:
+    if not uploaded:
         print("❌ No valid domains to upload")
         return
     
-    print(f"✓ Prepared {len(points)} points (skipped {skipped})")
-    
-    # Batch upload
-    batch_size = 100
-    for i in range(0, len(points), batch_size):
-        batch = points[i:i + batch_size]
-        try:
-            client.upsert(
-                collection_name=collection_name,
-                points=batch,
-                wait=True,
-            )
-            print(f"✓ Uploaded batch {i//batch_size + 1} ({len(batch)} points)")
-        except Exception as e:
-            print(f"❌ Batch upload failed: {e}")
-            return
-    
-    print(f"✅ Uploaded {len(points)} subdomains to '{collection_name}'")
+    print(f"✅ Uploaded {uploaded} subdomains to '{collection_name}' (skipped {skipped})")
 
 def verify_upload(client: QdrantClient, collection_name: str):
     """Verify collection contents (FIXED scroll handling)."""
@@ -166,12 +257,43 @@ def main():
         default=DEFAULT_VECTOR_SIZE,
         help=f"Vector dimension size (default: {DEFAULT_VECTOR_SIZE})"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=UPLOAD_BATCH_SIZE,
+        help=f"Points per upload request (default: {UPLOAD_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=UPLOAD_PARALLEL,
+        help=f"Parallel upload workers (default: {UPLOAD_PARALLEL})"
+    )
+    parser.add_argument(
+        "--grpc",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=f"Upload over gRPC on port {DEFAULT_GRPC_PORT}; --no-grpc falls back to REST (default: on)"
+    )
+    parser.add_argument(
+        "--verify",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Count the points and print a few samples after the upload (default: off)"
+    )
     
     args = parser.parse_args()
     
     # Connect to Qdrant first (validate connection)
     try:
-        client = QdrantClient(host=args.host, port=args.port)
+        client = QdrantClient(
+            host=args.host,
+            port=args.port,
+            grpc_port=DEFAULT_GRPC_PORT,
+            prefer_grpc=args.grpc,
+            pool_size=GRPC_POOL_SIZE,
+            timeout=CLIENT_TIMEOUT,
+        )
         print(f"✓ Connected to Qdrant at {args.host}:{args.port}")
     except Exception as e:
         print(f"❌ Cannot connect to Qdrant: {e}")
@@ -187,8 +309,12 @@ def main():
     
     # Upload
     if ensure_collection(client, args.collection, args.vector_size):
-        upload_subdomains(client, args.collection, domains, args.vector_size)
-        verify_upload(client, args.collection)
+        upload_subdomains(
+            client, args.collection, domains, args.vector_size,
+            batch_size=args.batch_size, parallel=args.concurrency,
+        )
+        if args.verify:
+            verify_upload(client, args.collection)
         print(f"\n🎉 COMPLETE: '{args.collection}' ready!")
     else:
         print("❌ Upload failed - check collection creation")
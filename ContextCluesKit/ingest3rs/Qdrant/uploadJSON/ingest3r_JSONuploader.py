@@ -1,33 +1,105 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import mmap
 import os
 import sys
-import random
-from typing import List, Dict, Any
+from itertools import chain
+from typing import Dict, Any, Iterable, Iterator
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import Distance, VectorParams, PointStruct, OptimizersConfigDiff, FilterSelector, Filter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # ---------------- Configuration ---------------- #
 DEFAULT_VECTOR_SIZE = 384
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 6333
+DEFAULT_GRPC_PORT = 6334
+GRPC_POOL_SIZE = 16  # concurrent HTTP/2 channels for gRPC upserts
+CLIENT_TIMEOUT = 60
 DEFAULT_COLLECTION_NAME = "universal_json"
+UPLOAD_BATCH_SIZE = 64
+UPLOAD_PARALLEL = min(8, os.cpu_count() or 1)
+INDEXING_THRESHOLD = 20000  # Qdrant's default, restored when the upload ends
+MMAP_THRESHOLD = 64 * 1024 * 1024  # JSON files at least this big are memory-mapped
+_SKIP_KEYS = frozenset(("id", "vector", "text"))  # record keys left out of the payload
 
 # ---------------- Helper functions ---------------- #
 
-def generate_dummy_vector(size: int) -> List[float]:
-    """Generate a dummy vector for each record."""
-    return [random.uniform(-1.0, 1.0) for _ in range(size)]
+def generate_dummy_vectors(count: int, size: int) -> np.ndarray:
+    """Generate a batch of dummy vectors in one call, one row per record."""
+    return np.random.default_rng().uniform(-1.0, 1.0, size=(count, size)).astype(np.float32)
+
+def has_vector(record: Dict[str, Any], size: int) -> bool:
+    """True if the record already carries a vector of the collection's size."""
+    vec = record.get("vector")
+    return isinstance(vec, list) and len(vec) == size
+
+def _orjson_load(path: str) -> Any:
+    """Parse a JSON file with orjson; large files are memory-mapped instead of read into a copy."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def _starts_with_array(path: str) -> bool:
+    """Peek at the first non-whitespace byte to see if the JSON root is an array."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return False
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped.startswith(b'[')
 
-def load_json(path: str) -> List[Dict[str, Any]]:
-    """Load JSON file and ensure it is a list of dicts."""
+def _stream_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the objects of a top-level JSON array one at a time, skipping non-objects."""
+    with open(path, 'rb') as f:
+        for obj in ijson.items(f, 'item', use_float=True):
+            if isinstance(obj, dict):
+                yield obj
+
+def load_json(path: str) -> Iterable[Dict[str, Any]]:
+    """Load JSON file and ensure it is a list of dicts.
+
+    A top-level array is streamed record by record when ijson is installed,
+    so memory stays bounded by one upload batch instead of the file size.
+    The first record is parsed here, so an empty or unreadable file fails
+    before the collection is touched; a file that breaks off later still
+    fails part way through the upload.
+    """
     if not os.path.exists(path):
         raise FileNotFoundError(f"❌ JSON file not found: {path}")
     
+    if ijson is not None and _starts_with_array(path):
+        records = _stream_records(path)
+        try:
+            first = next(records, None)
+        except Exception as e:
+            raise ValueError(f"❌ Error reading JSON: {e}")
+        if first is None:
+            raise ValueError("❌ No valid objects found in JSON")
+        print(f"✓ Streaming records from '{path}'")
+        return chain((first,), records)
+    
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if orjson is not None:
+            data = _orjson_load(path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
     except Exception as e:
         raise ValueError(f"❌ Error reading JSON: {e}")
 
@@ -43,7 +115,7 @@ def load_json(path: str) -> List[Dict[str, Any]]:
     print(f"✓ Loaded {len(records)} records from '{path}'")
     return records
 
-def infer_vector_size_from_records(records: List[Dict[str, Any]]) -> int:
+def infer_vector_size_from_records(records: Iterable[Dict[str, Any]]) -> int:
     """Infer vector size from JSON records or use default."""
     for r in records:
         vec = r.get("vector")
@@ -54,10 +126,19 @@ def infer_vector_size_from_records(records: List[Dict[str, Any]]) -> int:
 # ---------------- Qdrant upload logic ---------------- #
 
 def create_collection_if_needed(client: QdrantClient, name: str, vector_size: int) -> None:
-    """Create a new collection (delete if exists)."""
+    """Create the collection, or empty an existing one with the same vector config."""
+    # No HNSW indexing while the bulk upload is running
+    bulk_optimizers = OptimizersConfigDiff(indexing_threshold=0)
     try:
         if client.collection_exists(name):
-            print(f"Collection '{name}' exists. Recreating...")
+            current = client.get_collection(name).config.params.vectors
+            if isinstance(current, VectorParams) and current.size == vector_size and current.distance == Distance.COSINE:
+                # Same vector config: drop the old points but keep the collection
+                client.delete(name, points_selector=FilterSelector(filter=Filter()), wait=True)
+                client.update_collection(collection_name=name, optimizers_config=bulk_optimizers)
+                print(f"✓ Emptied collection '{name}' for re-import (vector size {vector_size})")
+                return
+            print(f"Collection '{name}' exists with another vector config. Recreating...")
             client.delete_collection(name)
 
         print(f"✓ Created collection '{name}' with vector size {vector_size}")
@@ -66,7 +147,10 @@ def create_collection_if_needed(client: QdrantClient, name: str, vector_size: in
             vectors_config=VectorParams(
                 size=vector_size,
                 distance=Distance.COSINE,
+                # Memmapped vectors keep large ingests from being bounded by RAM
+                on_disk=True,
             ),
+            optimizers_config=bulk_optimizers,
         )
     except Exception as e:
         print(f"❌ Collection creation failed: {e}")
@@ -78,12 +162,23 @@ def upload_json_to_qdrant(
     host: str = DEFAULT_HOST,
     port: int = DEFAULT_PORT,
     vector_size: int = DEFAULT_VECTOR_SIZE,
+    batch_size: int = UPLOAD_BATCH_SIZE,
+    parallel: int = UPLOAD_PARALLEL,
+    prefer_grpc: bool = True,
+    verify: bool = False,
 ) -> None:
     """Main function: read JSON, infer/create vectors, upload to Qdrant."""
     
     # Connect to Qdrant
     try:
-        client = QdrantClient(host=host, port=port)
+        client = QdrantClient(
+            host=host,
+            port=port,
+            grpc_port=DEFAULT_GRPC_PORT,
+            prefer_grpc=prefer_grpc,
+            pool_size=GRPC_POOL_SIZE,
+            timeout=CLIENT_TIMEOUT,
+        )
         print(f"✓ Connected to Qdrant at {host}:{port}")
     except Exception as e:
         print(f"❌ Cannot connect to Qdrant at {host}:{port}: {e}")
@@ -97,12 +192,12 @@ def upload_json_to_qdrant(
         print(e)
         return
     
-    if not records:
-        print("❌ No valid records to process!")
-        return
-    
-    # Use provided vector_size or infer
-    final_vector_size = vector_size if vector_size else infer_vector_size_from_records(records)
+    # Use provided vector_size or infer (inference needs the records in memory)
+    if vector_size:
+        final_vector_size = vector_size
+    else:
+        records = list(records)
+        final_vector_size = infer_vector_size_from_records(records)
     print(f"✓ Using vector size: {final_vector_size}")
 
     # Create collection
@@ -111,52 +206,64 @@ def upload_json_to_qdrant(
     except Exception as e:
         return
 
-    # Create points
-    points = []
-    for idx, record in enumerate(records, start=1):
-        point_id = record.get("id", idx)
+    # Points are built lazily and uploaded in parallel batches
+    uploaded = 0
 
-        # Use existing vector or generate dummy
-        record_vector = record.get("vector")
-        if isinstance(record_vector, list) and len(record_vector) == final_vector_size:
-            vector = record_vector
-        else:
-            vector = generate_dummy_vector(final_vector_size)
-
-        # FIXED: Clean payload structure
-        payload = {
-            "id": point_id,
-            **{k: v for k, v in record.items() if k not in ("id", "vector", "text")}
-        }
-
-        points.append(
-            PointStruct(
-                id=point_id,
-                vector=vector,
-                payload=payload,
-            )
+    def iter_points() -> Iterator[PointStruct]:
+        nonlocal uploaded
+        for idx, record in enumerate(records, start=1):
+            point_id = record.get("id", idx)
+
+            # Dummy vectors are drawn one batch at a time
+            if uploaded % batch_size == 0:
+                dummies = iter(generate_dummy_vectors(batch_size, final_vector_size))
+
+            # Use existing vector or generate dummy
+            if has_vector(record, final_vector_size):
+                vector = record["vector"]
+            else:
+                vector = next(dummies)
+
+            # FIXED: Clean payload structure
+            payload = {k: v for k, v in record.items() if k not in _SKIP_KEYS}
+            payload["id"] = point_id
+
+            uploaded += 1
+            yield PointStruct(id=point_id, vector=vector, payload=payload)
+
+    print(f"✓ Uploading with batch_size={batch_size}, concurrency={parallel}")
+    try:
+        # Batches are acknowledged once they reach the WAL, so requests go out
+        # back to back instead of waiting on each flush; readers may briefly
+        # miss points while Qdrant applies them
+        client.upload_points(
+            collection_name=collection_name,
+            points=iter_points(),
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=False,
+        )
+        # One exact count as the sync call at the end of the load
+        client.count(collection_name=collection_name, exact=True)
+    except Exception as e:
+        print(f"❌ Batch upload failed: {e}")
+        return
+    finally:
+        # Re-enable HNSW indexing even if the upload failed part way
+        client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD),
         )
 
-    if not points:
+    if not uploaded:
         print("❌ No valid points to create!")
         return
 
-    # Batch upload
-    batch_size = 100
-    for i in range(0, len(points), batch_size):
-        batch = points[i:i + batch_size]
-        try:
-            op_info = client.upsert(
-                collection_name=collection_name,
-                points=batch,
-                wait=True,
-            )
-            print(f"✓ Uploaded batch {i//batch_size + 1} ({len(batch)} points)")
-        except Exception as e:
-            print(f"❌ Batch upload failed: {e}")
-            return
+    print(f"✅ Uploaded {uploaded} points to '{collection_name}'")
 
-    print(f"✅ Uploaded {len(points)} points to '{collection_name}'")
+    # Count plus a scroll is two extra round-trips, so it only runs on request
+    if not verify:
+        return
 
     # Verify with scroll (FIXED)
     try:
@@ -208,6 +315,30 @@ def main():
         default=DEFAULT_VECTOR_SIZE,
         help=f"Vector dimension size (default: {DEFAULT_VECTOR_SIZE}, 0=auto-infer)"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=UPLOAD_BATCH_SIZE,
+        help=f"Points per upload request (default: {UPLOAD_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=UPLOAD_PARALLEL,
+        help=f"Parallel upload workers (default: {UPLOAD_PARALLEL})"
+    )
+    parser.add_argument(
+        "--grpc",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=f"Upload over gRPC on port {DEFAULT_GRPC_PORT}; --no-grpc falls back to REST (default: on)"
+    )
+    parser.add_argument(
+        "--verify",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Count the points and print a few samples after the upload (default: off)"
+    )
     
     args = parser.parse_args()
     
@@ -216,7 +347,11 @@ def main():
         collection_name=args.collection,
         host=args.host,
         port=args.port,
-        vector_size=args.vector_size if args.vector_size > 0 else None
+        vector_size=args.vector_size if args.vector_size > 0 else None,
+        batch_size=args.batch_size,
+        parallel=args.concurrency,
+        prefer_grpc=args.grpc,
+        verify=args.verify,
     )
     
     print(f"\n🎉 COMPLETE: '{args.collection}' ready for search!")
@@ -1,29 +1,55 @@
 import argparse
 import json
+import mmap
 import os
-import random
 import sys
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import Distance, VectorParams, PointStruct, OptimizersConfigDiff, FilterSelector, Filter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_GRPC_PORT = 6334
+UPLOAD_BATCH_SIZE = 64
+UPLOAD_PARALLEL = min(8, os.cpu_count() or 1)
+INDEXING_THRESHOLD = 20000  # Qdrant's default, restored when the upload ends
+MMAP_THRESHOLD = 64 * 1024 * 1024  # JSON files at least this big are memory-mapped
+
+_RNG = np.random.default_rng()
 
 # ---------------- Helper functions ---------------- #
 
-def generate_dummy_vector(size: int) -> List[float]:
+def generate_dummy_vector(size: int) -> np.ndarray:
     """
-    Generate a dummy vector for each record.
+    Generate a float32 dummy vector for each record.
     Replace this with a real embedding model in production.
     """
-    return [random.uniform(-1.0, 1.0) for _ in range(size)]
+    return _RNG.uniform(-1.0, 1.0, size).astype(np.float32)
+
+
+def _orjson_load(path: str) -> Any:
+    """Parse a JSON file with orjson; large files are memory-mapped instead of read into a copy."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
 
 
 def load_json(path: str) -> List[Dict[str, Any]]:
     """
     Load JSON file and ensure it is a list of dicts.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    if orjson is not None:
+        data = _orjson_load(path)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
     if isinstance(data, dict):
         data = [data]
@@ -60,16 +86,29 @@ def save_upload_report(collection_name: str, points_count: int, output_json: Opt
     }
     if output_json:
         os.makedirs(os.path.dirname(output_json) or '.', exist_ok=True)
-        with open(output_json, 'w') as f:
-            json.dump(report, f, indent=2)
+        if orjson is not None:
+            with open(output_json, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_json, 'w') as f:
+                json.dump(report, f, indent=2)
         print(f"✓ Upload report saved to: {output_json}")
 
 
 # ---------------- Qdrant upload logic ---------------- #
 
 def create_collection_if_needed(client: QdrantClient, name: str, vector_size: int) -> None:
-    """Create a new collection with given name and vector size. Delete existing first."""
+    """Create the collection, or empty an existing one with the same vector size."""
+    # No HNSW indexing while the bulk upload is running
+    bulk_optimizers = OptimizersConfigDiff(indexing_threshold=0)
     if client.collection_exists(name):
+        current = client.get_collection(name).config.params.vectors
+        if isinstance(current, VectorParams) and current.size == vector_size and current.distance == Distance.COSINE:
+            # Same vector config: drop the old points but keep the collection
+            client.delete(name, points_selector=FilterSelector(filter=Filter()), wait=True)
+            client.update_collection(collection_name=name, optimizers_config=bulk_optimizers)
+            print(f"✓ Emptied collection '{name}' for re-import (vector size {vector_size})")
+            return
         client.delete_collection(name)
 
     client.create_collection(
@@ -77,7 +116,10 @@ def create_collection_if_needed(client: QdrantClient, name: str, vector_size: in
         vectors_config=VectorParams(
             size=vector_size,
             distance=Distance.COSINE,
+            # Memmapped vectors keep large ingests from being bounded by RAM
+            on_disk=True,
         ),
+        optimizers_config=bulk_optimizers,
     )
     print(f"✓ Created collection '{name}' with vector size {vector_size}")
 
@@ -89,6 +131,9 @@ def upload_json_to_qdrant(
     port: int,
     vector_size_override: Optional[int],
     output_json: Optional[str],
+    batch_size: int = UPLOAD_BATCH_SIZE,
+    parallel: int = UPLOAD_PARALLEL,
+    prefer_grpc: bool = True,
 ) -> None:
     """
     Main upload function with full CLI parameter support.
@@ -108,33 +153,52 @@ def upload_json_to_qdrant(
         raise ValueError("No vector size provided and none could be inferred from JSON data")
 
     qdrant_url = f"http://{host}:{port}"
-    client = QdrantClient(url=qdrant_url)
+    client = QdrantClient(url=qdrant_url, grpc_port=DEFAULT_GRPC_PORT, prefer_grpc=prefer_grpc)
     print(f"✓ Connected to Qdrant at {qdrant_url}")
 
     create_collection_if_needed(client, collection_name, vector_size)
 
-    points: List[PointStruct] = []
-    for idx, record in enumerate(records, start=1):
-        point_id = record.get("id", idx)
-        record_vector = record.get("vector")
-        
-        if isinstance(record_vector, list) and len(record_vector) == vector_size:
-            vector = record_vector
-        else:
-            vector = generate_dummy_vector(vector_size)
+    def iter_points() -> Iterator[PointStruct]:
+        # Built lazily so upload_points can batch them across worker processes
+        for idx, record in enumerate(records, start=1):
+            point_id = record.get("id", idx)
+            record_vector = record.get("vector")
+            
+            if isinstance(record_vector, list) and len(record_vector) == vector_size:
+                vector = record_vector
+            else:
+                vector = generate_dummy_vector(vector_size)
 
-        points.append(PointStruct(id=point_id, vector=vector, payload=record))
+            yield PointStruct(id=point_id, vector=vector, payload=record)
 
-    op_info = client.upsert(collection_name=collection_name, points=points, wait=True)
-    print(f"✓ Upsert completed: {op_info.status}")
-    print(f"✓ Uploaded {len(points)} points to '{collection_name}'")
+    print(f"✓ Uploading with batch_size={batch_size}, concurrency={parallel}")
+    try:
+        # Batches are acknowledged once they reach the WAL, so requests go out
+        # back to back instead of waiting on each flush; readers may briefly
+        # miss points while Qdrant applies them
+        client.upload_points(
+            collection_name=collection_name,
+            points=iter_points(),
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=False,
+        )
+        # One exact count as the sync call at the end of the load
+        client.count(collection_name=collection_name, exact=True)
+    finally:
+        # Re-enable HNSW indexing even if the upload failed part way
+        client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD),
+        )
+    print(f"✓ Uploaded {len(records)} points to '{collection_name}'")
 
     if output_json:
-        save_upload_report(collection_name, len(points), output_json)
+        save_upload_report(collection_name, len(records), output_json)
 
     print("\nSample payloads:")
-    for p in points[:3]:
-        print(f"  ID={p.id}")
+    for idx, record in enumerate(records[:3], start=1):
+        print(f"  ID={record.get('id', idx)}")
 
 
 # ---------------- CLI entrypoint ---------------- #
@@ -164,6 +228,24 @@ def main() -> None:
         type=int,
         help="Vector dimension size (overrides inference)"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=UPLOAD_BATCH_SIZE,
+        help="Points per upload request"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=UPLOAD_PARALLEL,
+        help="Parallel upload workers"
+    )
+    parser.add_argument(
+        "--grpc",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=f"Upload over gRPC on port {DEFAULT_GRPC_PORT}; --no-grpc falls back to REST"
+    )
     parser.add_argument(
         "input_file",
         help="Input JSON file path"
@@ -193,6 +275,9 @@ def main() -> None:
             args.port,
             args.vector_size,
             args.output_json,
+            args.batch_size,
+            args.concurrency,
+            args.grpc,
         )
         print(f"\n✓ Done! Collection '{args.collection}' ready for queries.")
     except Exception as e:
@@ -1,41 +1,112 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import mmap
 import os
 import sys
+from itertools import chain
 from pathlib import Path
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import Distance, VectorParams, PointStruct, OptimizersConfigDiff, FilterSelector, Filter
 import numpy as np
-import random
-from typing import List, Dict, Any
+from typing import Dict, Any, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # ---------------- Configuration ---------------- #
 DEFAULT_VECTOR_SIZE = 384
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 6333
+DEFAULT_GRPC_PORT = 6334
+GRPC_POOL_SIZE = 16  # concurrent HTTP/2 channels for gRPC upserts
+CLIENT_TIMEOUT = 60
 DEFAULT_COLLECTION_NAME = "sslscan_results"
+UPLOAD_BATCH_SIZE = 64
+UPLOAD_PARALLEL = min(8, os.cpu_count() or 1)
+INDEXING_THRESHOLD = 20000  # Qdrant's default, restored when the upload ends
+MMAP_THRESHOLD = 64 * 1024 * 1024  # JSON files at least this big are memory-mapped
+
+_RNG = np.random.default_rng()
+_WEAK_PROTOCOLS = frozenset(("SSLv2", "SSLv3", "TLSv1.0", "TLSv1.1"))  # counted when enabled
+# Scalar certificate fields written by convert3r_sslscanTXT, copied into the payload
+_CERT_FIELDS = (
+    "subject", "issuer", "signature_algorithm", "rsa_key_strength", "ecc_curve_name",
+    "ecc_key_strength", "not_valid_before", "not_valid_after",
+)
+
+def _orjson_load(path: str) -> Any:
+    """Parse a JSON file with orjson; large files are memory-mapped instead of read into a copy."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def _starts_with_array(path: str) -> bool:
+    """Peek at the first non-whitespace byte to see if the JSON root is an array."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return False
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped.startswith(b'[')
 
-def create_simple_embedding(text: str, dim: int = 128) -> List[float]:
+def read_entries(path: str) -> Iterable[Dict[str, Any]]:
+    """Return the scan entries; a top-level array is streamed with ijson when available.
+
+    The first streamed entry is parsed here, so an unreadable file fails
+    before the collection is touched.
+    """
+    if ijson is not None and _starts_with_array(path):
+        def _stream():
+            with open(path, 'rb') as f:
+                yield from ijson.items(f, 'item', use_float=True)
+        entries = _stream()
+        first = next(entries, None)
+        return [] if first is None else chain((first,), entries)
+    if orjson is not None:
+        data = _orjson_load(path)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    print(f"✓ Loaded {len(data)} sslscan entries")
+    return data
+
+def create_simple_embedding(text: str, dim: int = 128) -> np.ndarray:
     """Simple hash-based embedding for demo purposes."""
-    vec = np.zeros(dim)
-    for i, char in enumerate(text.lower()):
-        if i >= dim:
-            break
-        vec[i] = (ord(char) % 256) / 255.0
+    # Code points of the first dim characters, read in one go as UTF-32 words
+    codes = np.frombuffer(text.lower()[:dim].encode("utf-32-le"), dtype=np.uint32)
+    vec = np.zeros(dim, dtype=np.float32)
+    vec[:len(codes)] = (codes % 256) / 255.0
     
     # Add slight random noise for unique vectors
-    vec += np.random.normal(0, 0.01, dim)
-    vec = np.clip(vec, -1.0, 1.0)
+    vec += _RNG.standard_normal(dim, dtype=np.float32) * 0.01
+    np.clip(vec, -1.0, 1.0, out=vec)
     
-    return vec.tolist()
+    return vec
 
 def upload_sslscan_to_qdrant(
     json_file: str, 
     collection_name: str = DEFAULT_COLLECTION_NAME,
     host: str = DEFAULT_HOST,
     port: int = DEFAULT_PORT,
-    vector_size: int = DEFAULT_VECTOR_SIZE
+    vector_size: int = DEFAULT_VECTOR_SIZE,
+    batch_size: int = UPLOAD_BATCH_SIZE,
+    parallel: int = UPLOAD_PARALLEL,
+    prefer_grpc: bool = True,
+    verify: bool = False
 ):
     """Parse sslscan JSON and upload to Qdrant with full CLI options."""
     
@@ -46,7 +117,14 @@ def upload_sslscan_to_qdrant(
     
     # Connect to Qdrant
     try:
-        client = QdrantClient(host=host, port=port)
+        client = QdrantClient(
+            host=host,
+            port=port,
+            grpc_port=DEFAULT_GRPC_PORT,
+            prefer_grpc=prefer_grpc,
+            pool_size=GRPC_POOL_SIZE,
+            timeout=CLIENT_TIMEOUT,
+        )
         print(f"✓ Connected to Qdrant at {host}:{port}")
     except Exception as e:
         print(f"❌ Cannot connect to Qdrant at {host}:{port}: {e}")
@@ -55,94 +133,123 @@ def upload_sslscan_to_qdrant(
     
     # Read JSON results
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            sslscan_data = json.load(f)
-        if isinstance(sslscan_data, dict):
-            sslscan_data = [sslscan_data]
+        sslscan_data = read_entries(json_file)
     except Exception as e:
         print(f"❌ Error reading JSON: {e}")
         return
     
-    print(f"✓ Loaded {len(sslscan_data)} sslscan entries")
-    
-    # Create/recreate collection
+    # Create the collection, or empty an existing one with the same vector config
+    # No HNSW indexing while the bulk upload is running
+    bulk_optimizers = OptimizersConfigDiff(indexing_threshold=0)
     try:
+        current = None
         if client.collection_exists(collection_name):
-            print(f"Collection '{collection_name}' exists. Recreating...")
-            client.delete_collection(collection_name)
-        
-        client.create_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
-        )
-        print(f"✓ Collection '{collection_name}' created (vector_size={vector_size})")
+            current = client.get_collection(collection_name).config.params.vectors
+        if isinstance(current, VectorParams) and current.size == vector_size and current.distance == Distance.COSINE:
+            client.delete(collection_name, points_selector=FilterSelector(filter=Filter()), wait=True)
+            client.update_collection(collection_name=collection_name, optimizers_config=bulk_optimizers)
+            print(f"✓ Collection '{collection_name}' emptied for re-import (vector_size={vector_size})")
+        else:
+            if current is not None:
+                print(f"Collection '{collection_name}' exists with another vector config. Recreating...")
+                client.delete_collection(collection_name)
+            client.create_collection(
+                collection_name=collection_name,
+                # Memmapped vectors keep large ingests from being bounded by RAM
+                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE, on_disk=True),
+                optimizers_config=bulk_optimizers,
+            )
+            print(f"✓ Collection '{collection_name}' created (vector_size={vector_size})")
         
     except Exception as e:
         print(f"❌ Collection creation failed: {e}")
         return
     
-    # Prepare points for upload
-    points = []
+    # Points are built lazily and uploaded in parallel batches
+    total = 0
     
-    for entry in sslscan_data:
-        entry_id = entry.get("id", len(points) + 1)
-        
-        # Create comprehensive text summary for embedding
-        protocols = list(entry.get('protocols', {}).keys()) if entry.get('protocols') else []
-        ciphers_count = len(entry.get('ciphers', []))
-        cert = entry.get('certificate', {})
-        subject = cert.get('subject', 'N/A')
-        
-        summary = (
-            f"{entry.get('target', 'N/A')} "
-            f"{entry.get('ip', 'N/A')} "
-            f"TLS protocols: {', '.join(protocols)} "
-            f"Ciphers: {ciphers_count} "
-            f"Subject: {subject}"
+    def iter_points() -> Iterator[PointStruct]:
+        nonlocal total
+        for entry in sslscan_data:
+            total += 1
+            entry_id = entry.get("id", total)
+            
+            # Create comprehensive text summary for embedding
+            protos = entry.get('protocols') or {}
+            protocols = list(protos)
+            ciphers_count = len(entry.get('ciphers', []))
+            cert = entry.get('certificate', {})
+            subject = cert.get('subject', 'N/A')
+            
+            summary = (
+                f"{entry.get('target', 'N/A')} "
+                f"{entry.get('ip', 'N/A')} "
+                f"TLS protocols: {', '.join(protocols)} "
+                f"Ciphers: {ciphers_count} "
+                f"Subject: {subject}"
+            )
+            
+            # Generate embedding with correct dimension
+            vector = create_simple_embedding(summary, vector_size)
+            
+            # Build complete payload
+            payload = {
+                "entry_id": entry_id,
+                "scan_tool": "sslscan",
+                "ip": entry.get("ip"),
+                "target": entry.get("target"),
+                "port": entry.get("port", 443),
+                "sni": entry.get("sni"),
+                "protocols": entry.get("protocols", {}),
+                "ciphers_count": ciphers_count,
+                "weak_protocols_count": sum(1 for k, v in protos.items() if v == "enabled" and k in _WEAK_PROTOCOLS),
+                "certificate_issuer": cert.get("issuer"),
+                "certificate_altnames_count": len(cert.get("altnames", [])),
+                "summary": summary,
+            }
+            # Scalar certificate fields only; the altnames list is represented by its count
+            payload.update((k, cert[k]) for k in _CERT_FIELDS if k in cert)
+            
+            yield PointStruct(
+                id=entry_id,
+                vector=vector,
+                payload=payload
+            )
+    
+    print(f"✓ Uploading with batch_size={batch_size}, concurrency={parallel}")
+    try:
+        # Batches are acknowledged once they reach the WAL, so requests go out
+        # back to back instead of waiting on each flush; readers may briefly
+        # miss points while Qdrant applies them
+        client.upload_points(
+            collection_name=collection_name,
+            points=iter_points(),
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=False,
         )
-        
-        # Generate embedding with correct dimension
-        vector = create_simple_embedding(summary, vector_size)
-        
-        # Build complete payload
-        payload = {
-            "entry_id": entry_id,
-            "scan_tool": "sslscan",
-            "ip": entry.get("ip"),
-            "target": entry.get("target"),
-            "port": entry.get("port", 443),
-            "sni": entry.get("sni"),
-            "protocols": entry.get("protocols", {}),
-            "ciphers_count": ciphers_count,
-            "weak_protocols_count": sum(1 for k, v in entry.get("protocols", {}).items() 
-                                      if v == "enabled" and any(weak in k for weak in ["TLSv1.0", "TLSv1.1"])),
-            "certificate_subject": subject,
-            "certificate_issuer": cert.get("issuer"),
-            "certificate_altnames_count": len(cert.get("altnames", [])),
-            "summary": summary,
-            **cert  # Include full certificate data
-        }
-        
-        point = PointStruct(
-            id=entry_id,
-            vector=vector,
-            payload=payload
+        # One exact count as the sync call at the end of the load
+        client.count(collection_name=collection_name, exact=True)
+    except Exception as e:
+        print(f"❌ Batch upload failed: {e}")
+        return
+    finally:
+        # Re-enable HNSW indexing even if the upload failed part way
+        client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD),
         )
-        points.append(point)
     
-    # Upload in batches
-    batch_size = 50
-    for i in range(0, len(points), batch_size):
-        batch = points[i:i + batch_size]
-        client.upsert(collection_name=collection_name, points=batch, wait=True)
-        print(f"✓ Uploaded batch {i//batch_size + 1} ({len(batch)} points)")
-    
-    # Verify upload
-    count = client.count(collection_name=collection_name)
     print(f"\n🎉 SUCCESS!")
-    print(f"   Total points: {len(points)}")
+    print(f"   Total points: {total}")
     print(f"   Collection: '{collection_name}'")
     print(f"   Vector size: {vector_size}")
+    
+    # Count plus a scroll is two extra round-trips, so it only runs on request
+    if not verify:
+        return
+    
+    count = client.count(collection_name=collection_name)
     print(f"   Qdrant verified: {count.count}")
     
     # FIXED: Correct scroll() handling - returns (points_list, next_offset)
@@ -182,6 +289,30 @@ def main():
         default=DEFAULT_VECTOR_SIZE,
         help=f"Vector dimension size (default: {DEFAULT_VECTOR_SIZE})"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=UPLOAD_BATCH_SIZE,
+        help=f"Points per upload request (default: {UPLOAD_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=UPLOAD_PARALLEL,
+        help=f"Parallel upload workers (default: {UPLOAD_PARALLEL})"
+    )
+    parser.add_argument(
+        "--grpc",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=f"Upload over gRPC on port {DEFAULT_GRPC_PORT}; --no-grpc falls back to REST (default: on)"
+    )
+    parser.add_argument(
+        "--verify",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Count the points and print a few samples after the upload (default: off)"
+    )
     
     args = parser.parse_args()
     
@@ -190,7 +321,11 @@ def main():
         collection_name=args.collection,
         host=args.host,
         port=args.port,
-        vector_size=args.vector_size
+        vector_size=args.vector_size,
+        batch_size=args.batch_size,
+        parallel=args.concurrency,
+        prefer_grpc=args.grpc,
+        verify=args.verify
     )
 
 if __name__ == "__main__":
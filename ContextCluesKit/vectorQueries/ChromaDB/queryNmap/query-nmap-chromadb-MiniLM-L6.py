@@ -13,8 +13,196 @@ Prerequisites:
 import argparse
 import sys
 import os
+import re
+import json
+import gzip
+import base64
+import hashlib
+import sqlite3
+from functools import lru_cache
+from itertools import islice
+import numpy as np
 import chromadb
 from chromadb.config import Settings
+from chromadb.utils import embedding_functions
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Same model the importer uses, so query vectors live in the collection's space
+EMBED_MODEL = 'all-MiniLM-L6-v2'
+
+# Queries whose embeddings are at least this similar reuse earlier results
+SEMANTIC_CACHE_THRESHOLD = 0.86
+SEMANTIC_CACHE_SIZE = 100
+
+# Keep-alive connections ChromaDB's pooled httpx client may hold open, so
+# the many small requests of interactive mode reuse one connection
+HTTP_MAX_CONNECTIONS = 4
+
+# Whole service lines matched with finditer() over a host's service text
+HTTP_LINE_RE = re.compile(r'^(?=.*/).*http.*$', re.IGNORECASE | re.MULTILINE)
+SSH_LINE_RE = re.compile(r'^.*(?:(?i:ssh)|22/tcp).*$', re.MULTILINE)
+SMB_LINE_RE = re.compile(r'^.*(?:445|(?i:smb|microsoft-ds)).*$', re.MULTILINE)
+DATABASE_LINE_RE = re.compile(r'^.*(?:3306|5432|27017|6379|1433|mysql|postgres|mongo|redis).*$', re.MULTILINE)
+TCP_LINE_RE = re.compile(r'^(?=.*/)(?=.*:).*tcp.*$', re.IGNORECASE | re.MULTILINE)
+PORT_LINE_RE = re.compile(r'^(?=.*/).*:.*$', re.MULTILINE)
+
+# Exact metadata filters over the open_ports/services arrays the importer stores
+def any_service(ports=(), services=()):
+    """Build a where filter matching hosts with any of the given open ports or service names."""
+    clauses = [{"open_ports": {"$contains": port}} for port in ports]
+    clauses += [{"services": {"$contains": service}} for service in services]
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+HTTP_WHERE = any_service((80, 443, 8000, 8080, 8443), ('http', 'https', 'http-proxy', 'http-alt'))
+SSH_WHERE = any_service((22,), ('ssh',))
+SMB_WHERE = any_service((445,), ('microsoft-ds', 'netbios-ssn'))
+DATABASE_WHERE = any_service((3306, 5432, 27017, 6379, 1433),
+                             ('mysql', 'postgresql', 'mongodb', 'redis', 'ms-sql-s'))
+
+# Fields for queries that scan document text but never show distances
+DOCUMENT_FIELDS = ('documents', 'metadatas')
+
+_embedder = None
+_query_vectors = {}  # sha256(model, query) -> vector; optionally persisted with --embed-cache
+_semantic_cache = []  # ((n_results, include), unit vector, results), oldest first
+
+
+def get_embedder():
+    """Load the query embedder once: SentenceTransformer if installed, else ChromaDB's default."""
+    global _embedder
+    if _embedder is None:
+        if SentenceTransformer is not None:
+            model = SentenceTransformer(EMBED_MODEL)
+            _embedder = lambda text: model.encode([text], normalize_embeddings=True)[0]
+        else:
+            ef = embedding_functions.DefaultEmbeddingFunction()
+            _embedder = lambda text: ef([text])[0]
+    return _embedder
+
+
+@lru_cache(maxsize=256)
+def embed_query(text):
+    """Embed a query string; repeated queries reuse the cached vector."""
+    key = hashlib.sha256(f"{EMBED_MODEL}\0{text}".encode()).digest()
+    vector = _query_vectors.get(key)
+    if vector is None:
+        vector = tuple(float(x) for x in get_embedder()(text))
+        _query_vectors[key] = vector
+    return vector
+
+
+def open_query_cache(path):
+    """Open (creating if needed) the sqlite cache of query embeddings."""
+    cache = sqlite3.connect(path)
+    cache.execute("CREATE TABLE IF NOT EXISTS queries (hash BLOB PRIMARY KEY, emb BLOB)")
+    return cache
+
+
+def load_query_cache(path):
+    """Load query embeddings saved by an earlier run; an unreadable cache is ignored."""
+    try:
+        cache = open_query_cache(path)
+        try:
+            for key, emb in cache.execute("SELECT hash, emb FROM queries"):
+                _query_vectors[key] = tuple(np.frombuffer(emb, dtype=np.float32).tolist())
+        finally:
+            cache.close()
+    except sqlite3.DatabaseError as e:
+        print(f"⚠️ Ignoring query cache '{path}': {e}")
+
+
+def save_query_cache(path):
+    """Persist query embeddings so the next run can skip embedding them."""
+    cache = open_query_cache(path)
+    try:
+        with cache:
+            cache.executemany(
+                "INSERT OR REPLACE INTO queries (hash, emb) VALUES (?, ?)",
+                ((key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in _query_vectors.items()),
+            )
+    finally:
+        cache.close()
+
+
+def unpack_ports(metadata):
+    """Decode the gzip/base64 port table the importer stores in 'ports_gz'."""
+    packed = metadata.get('ports_gz')
+    if not packed:
+        return []
+    return json.loads(gzip.decompress(base64.b64decode(packed)))
+
+
+def format_port(port):
+    """Format a port entry as 'port/protocol: service (product version)'."""
+    service_info = f"{port['port']}/{port['protocol']}: {port['service']}"
+    if port.get('product'):
+        service_info += f" ({port['product']}"
+        if port.get('version'):
+            service_info += f" {port['version']}"
+        service_info += ")"
+    return service_info
+
+
+def service_text(doc, metadata):
+    """Return a host's open-port lines as one string, or its document for older imports without ports_gz."""
+    if 'ports_gz' not in metadata:
+        return doc
+    return '\n'.join(format_port(port) for port in unpack_ports(metadata) if port['state'] == 'open')
+
+
+def get_hosts(collection, where, limit):
+    """collection.get() projected to metadatas, since ports_gz carries the services.
+    
+    Documents are fetched by id only for hosts from older imports that have
+    open ports but no ports_gz.
+    """
+    results = collection.get(where=where, limit=limit, include=['metadatas'])
+    ids, metadatas = results['ids'], results['metadatas']
+    legacy = [host_id for host_id, metadata in zip(ids, metadatas)
+              if 'ports_gz' not in metadata and metadata.get('open_port_count')]
+    documents = {}
+    if legacy:
+        fetched = collection.get(ids=legacy, include=['documents'])
+        documents = dict(zip(fetched['ids'], fetched['documents']))
+    results['documents'] = [documents.get(host_id, '') for host_id in ids]
+    return results
+
+
+def matching_lines(pattern, text, limit=None):
+    """Return up to limit stripped lines of text matched by a multiline pattern."""
+    return [m.group(0).strip() for m in islice(pattern.finditer(text), limit)]
+
+
+def semantic_query(collection, text, n_results, include=('metadatas', 'documents', 'distances')):
+    """Query the collection, answering near-duplicate queries from an in-process cache.
+    
+    include limits the fields ChromaDB returns, so callers that only need
+    metadata skip transferring documents and distances.
+    """
+    key = (n_results, tuple(include))
+    vector = np.asarray(embed_query(text), dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+
+    for cached_key, cached_vector, results in _semantic_cache:
+        if cached_key == key and np.dot(vector, cached_vector) > SEMANTIC_CACHE_THRESHOLD:
+            return results
+
+    results = collection.query(
+        query_embeddings=[vector.tolist()],
+        n_results=n_results,
+        include=list(include)
+    )
+    _semantic_cache.append((key, vector, results))
+    if len(_semantic_cache) > SEMANTIC_CACHE_SIZE:
+        _semantic_cache.pop(0)
+    return results
 
 
 def print_section(title):
@@ -24,61 +212,64 @@ def print_section(title):
     print("="*70)
 
 
-def query_http_services(collection):
-    """Query for HTTP services and display IP, port, service."""
-    print_section("Query 1: Search for HTTP Services")
+def _run_keyword_query(collection, title, query_text, line_predicate=None, n=5,
+                       fields=(('IP Address', 'ip_address'),), empty_message="No Results",
+                       where=None):
+    """Run one demo query and print the requested metadata for each hit.
     
-    results = collection.query(
-        query_texts=["HTTP web server"],
-        n_results=5
-    )
+    With a where filter hosts are selected exactly from their open_ports/services
+    metadata; the semantic query is only used when the filter matches nothing,
+    e.g. for collections imported before those fields existed.
+    With a compiled multiline regex as line_predicate, each hit is numbered
+    and the service lines it matches are printed. Without one only metadata is fetched.
+    """
+    print_section(title)
+    
+    metadatas = []
+    if where is not None:
+        results = get_hosts(collection, where, n)
+        metadatas, documents = results['metadatas'], results['documents']
     
-    if results['documents'] and results['documents'][0]:
-        for i, (doc, metadata) in enumerate(zip(results['documents'][0], results['metadatas'][0]), 1):
+    if not metadatas:
+        include = DOCUMENT_FIELDS if line_predicate is not None else ['metadatas']
+        results = semantic_query(collection, query_text, n, include=include)
+        
+        if not (results['metadatas'] and results['metadatas'][0]):
+            print(empty_message)
+            return
+        
+        metadatas = results['metadatas'][0]
+        documents = results['documents'][0] if line_predicate is not None else [None] * len(metadatas)
+    for i, (doc, metadata) in enumerate(zip(documents, metadatas), 1):
+        if line_predicate is not None:
             print(f"\nResult {i}:")
-            print(f"  IP Address: {metadata.get('ip_address', 'N/A')}")
-            
-            # Extract port and service information from document
-            lines = doc.split('\n')
-            for line in lines:
-                if '/' in line and 'http' in line.lower():
-                    print(f"  {line.strip()}")
-    else:
-        print("No HTTP services found")
+        for label, key in fields:
+            print(f"  {label}: {metadata.get(key, 'N/A')}")
+        
+        if line_predicate is not None:
+            for line in matching_lines(line_predicate, service_text(doc, metadata)):
+                print(f"  {line}")
+
+
+def query_http_services(collection):
+    """Query for HTTP services and display IP, port, service."""
+    _run_keyword_query(collection, "Query 1: Search for HTTP Services", "HTTP web server",
+                       HTTP_LINE_RE, empty_message="No HTTP services found", where=HTTP_WHERE)
 
 
 def query_ssh_services(collection):
     """Query for SSH services."""
-    print_section("Query 2: Search for SSH Services")
-    
-    results = collection.query(
-        query_texts=["SSH secure shell"],
-        n_results=5
-    )
-    
-    if results['documents'] and results['documents'][0]:
-        for i, (doc, metadata) in enumerate(zip(results['documents'][0], results['metadatas'][0]), 1):
-            print(f"\nResult {i}:")
-            print(f"  IP Address: {metadata.get('ip_address', 'N/A')}")
-            
-            lines = doc.split('\n')
-            for line in lines:
-                if 'ssh' in line.lower() or '22/tcp' in line:
-                    print(f"  {line.strip()}")
-    else:
-        print("No SSH services found")
+    _run_keyword_query(collection, "Query 2: Search for SSH Services", "SSH secure shell",
+                       SSH_LINE_RE, empty_message="No SSH services found", where=SSH_WHERE)
 
 
 def query_by_port_count(collection):
     """Query hosts with multiple open ports."""
     print_section("Query 3: Hosts with More Than 3 Open Ports")
     
-    results = collection.get(
-        where={"open_port_count": {"$gt": 3}},
-        limit=5
-    )
+    results = get_hosts(collection, {"open_port_count": {"$gt": 3}}, 5)
     
-    if results['documents']:
+    if results['metadatas']:
         for i, (doc, metadata) in enumerate(zip(results['documents'], results['metadatas']), 1):
             print(f"\nHost {i}:")
             print(f"  IP Address: {metadata.get('ip_address', 'N/A')}")
@@ -86,43 +277,24 @@ def query_by_port_count(collection):
             print(f"  Open Ports: {metadata.get('open_port_count', 0)}")
             print("  Services:")
             
-            # Extract service lines
-            lines = doc.split('\n')
-            port_count = 0
+            # Show first 3 services
+            lines = matching_lines(TCP_LINE_RE, service_text(doc, metadata), 3)
             for line in lines:
-                if '/' in line and 'tcp' in line.lower() and ':' in line:
-                    print(f"    {line.strip()}")
-                    port_count += 1
-                    if port_count >= 3:  # Show first 3 services
-                        remaining = metadata.get('open_port_count', 0) - 3
-                        if remaining > 0:
-                            print(f"    ... and {remaining} more services")
-                        break
+                print(f"    {line}")
+            if len(lines) == 3:
+                remaining = metadata.get('open_port_count', 0) - 3
+                if remaining > 0:
+                    print(f"    ... and {remaining} more services")
     else:
         print("No hosts found with more than 3 open ports")
 
 
 def query_smb_services(collection):
     """Query for SMB/CIFS services (port 445)."""
-    print_section("Query 4: Search for SMB Services (Port 445)")
-    
-    results = collection.query(
-        query_texts=["445 SMB netbios microsoft-ds CIFS"],
-        n_results=5
-    )
-    
-    if results['documents'] and results['documents'][0]:
-        for i, (doc, metadata) in enumerate(zip(results['documents'][0], results['metadatas'][0]), 1):
-            print(f"\nResult {i}:")
-            print(f"  IP Address: {metadata.get('ip_address', 'N/A')}")
-            print(f"  Vendor: {metadata.get('vendor', 'N/A')}")
-            
-            lines = doc.split('\n')
-            for line in lines:
-                if '445' in line or 'smb' in line.lower() or 'microsoft-ds' in line.lower():
-                    print(f"  {line.strip()}")
-    else:
-        print("No SMB services found")
+    _run_keyword_query(collection, "Query 4: Search for SMB Services (Port 445)",
+                       "445 SMB netbios microsoft-ds CIFS", SMB_LINE_RE,
+                       fields=(('IP Address', 'ip_address'), ('Vendor', 'vendor')),
+                       empty_message="No SMB services found", where=SMB_WHERE)
 
 
 def get_all_active_hosts(collection):
@@ -131,72 +303,40 @@ def get_all_active_hosts(collection):
     
     results = collection.get(
         where={"state": "up"},
-        limit=20
+        limit=20,
+        include=['metadatas']
     )
     
-    if results['documents']:
-        print(f"\nFound {len(results['documents'])} active hosts")
+    if results['metadatas']:
+        print(f"\nFound {len(results['metadatas'])} active hosts")
         print("\n" + "-"*70)
         print(f"{'IP Address':<18} {'Hostname':<25} {'Ports':<8} {'Sample Service'}")
         print("-"*70)
         
-        for metadata, doc in zip(results['metadatas'], results['documents']):
+        for metadata in results['metadatas']:
             ip = metadata.get('ip_address', 'N/A')
-            hostname = metadata.get('hostname', 'N/A')[:24]
+            hostname = metadata.get('hostname', 'N/A')
             ports = metadata.get('open_port_count', 0)
             
-            # Extract first service
-            lines = doc.split('\n')
-            first_service = ""
-            for line in lines:
-                if '/' in line and ':' in line and 'tcp' in line.lower():
-                    parts = line.strip().split(':')
-                    if len(parts) >= 2:
-                        first_service = parts[0].strip()[-8:] + ":" + parts[1].strip()[:15]
-                    break
+            # First open TCP service, precomputed at import time, shortened to "port/proto:service"
+            port, sep, service = metadata.get('first_open_service', '').partition(':')
+            first_service = f"{port.strip()[-8:]}:{service.partition(':')[0].strip():.15}" if sep else ""
             
-            print(f"{ip:<18} {hostname:<25} {ports:<8} {first_service}")
+            print(f"{ip:<18} {hostname:<25.24} {ports:<8} {first_service}")
     else:
         print("No active hosts found")
 
 
 def custom_query_example(collection):
     """Demonstrate a custom query."""
-    print_section("Query 6: Custom Query - Search for Database Services")
-    
-    results = collection.query(
-        query_texts=["database mysql postgresql mongodb redis sql"],
-        n_results=5
-    )
-    
-    if results['documents'] and results['documents'][0]:
-        for i, (doc, metadata) in enumerate(zip(results['documents'][0], results['metadatas'][0]), 1):
-            print(f"\nResult {i}:")
-            print(f"  IP Address: {metadata.get('ip_address', 'N/A')}")
-            
-            lines = doc.split('\n')
-            for line in lines:
-                # Look for common database ports
-                if any(port in line for port in ['3306', '5432', '27017', '6379', '1433', 'mysql', 'postgres', 'mongo', 'redis']):
-                    print(f"  {line.strip()}")
-    else:
-        print("No database services found")
+    _run_keyword_query(collection, "Query 6: Custom Query - Search for Database Services",
+                       "database mysql postgresql mongodb redis sql", DATABASE_LINE_RE,
+                       empty_message="No database services found", where=DATABASE_WHERE)
 
 def simple_query_example(collection):
     """Demonstrate a simple query."""
-    print_section("Query 7: Simple Query - Search for what you enter --> SMTP")
-
-    results = collection.query(
-        query_texts=["smtp"],
-        n_results=5
-    )
-
-    if results['documents'] and results['documents'][0]:
-        for i, (doc, metadata) in enumerate(zip(results['documents'][0], results['metadatas'][0]), 1):
-            print(f"  IP Address: {metadata.get('ip_address', 'N/A')}")
-            print(f"  Hostname: {metadata.get('hostname', 'N/A')}")
-    else:
-        print("No Results")
+    _run_keyword_query(collection, "Query 7: Simple Query - Search for what you enter --> SMTP", "smtp",
+                       fields=(('IP Address', 'ip_address'), ('Hostname', 'hostname')))
 
 
 def interactive_mode(collection):
@@ -260,17 +400,18 @@ def interactive_mode(collection):
         if user_input.lower() == ":all":
             results = collection.get(
                 where={"state": "up"},
-                limit=100
+                limit=100,
+                include=['metadatas']
             )
-            if results['documents']:
-                print(f"\n  Found {len(results['documents'])} active hosts\n")
+            if results['metadatas']:
+                print(f"\n  Found {len(results['metadatas'])} active hosts\n")
                 print(f"  {'IP Address':<18} {'Hostname':<25} {'Ports'}")
                 print(f"  {'-'*55}")
                 for metadata in results['metadatas']:
                     ip = metadata.get('ip_address', 'N/A')
-                    hostname = metadata.get('hostname', 'N/A')[:24]
+                    hostname = metadata.get('hostname', 'N/A')
                     ports = metadata.get('open_port_count', 0)
-                    print(f"  {ip:<18} {hostname:<25} {ports}")
+                    print(f"  {ip:<18} {hostname:<25.24} {ports}")
             else:
                 print("  No active hosts found")
             continue
@@ -280,39 +421,34 @@ def interactive_mode(collection):
                 threshold = int(user_input.split()[1]) if len(user_input.split()) > 1 else 3
             except ValueError:
                 threshold = 3
-            results = collection.get(
-                where={"open_port_count": {"$gt": threshold}},
-                limit=n_results
-            )
-            if results['documents']:
+            results = get_hosts(collection, {"open_port_count": {"$gt": threshold}}, n_results)
+            if results['metadatas']:
                 print(f"\n  Hosts with more than {threshold} open ports:")
                 for i, (doc, metadata) in enumerate(zip(results['documents'], results['metadatas']), 1):
                     print(f"\n  [{i}] {metadata.get('ip_address', 'N/A')} "
                           f"({metadata.get('hostname', 'N/A')}) - "
                           f"{metadata.get('open_port_count', 0)} open ports")
-                    lines = doc.split('\n')
-                    shown = 0
+                    lines = matching_lines(TCP_LINE_RE, service_text(doc, metadata), 5)
                     for line in lines:
-                        if '/' in line and 'tcp' in line.lower() and ':' in line:
-                            print(f"      {line.strip()}")
-                            shown += 1
-                            if shown >= 5:
-                                remaining = metadata.get('open_port_count', 0) - shown
-                                if remaining > 0:
-                                    print(f"      ... and {remaining} more")
-                                break
+                        print(f"      {line}")
+                    if len(lines) == 5:
+                        remaining = metadata.get('open_port_count', 0) - 5
+                        if remaining > 0:
+                            print(f"      ... and {remaining} more")
             else:
                 print(f"  No hosts found with more than {threshold} open ports")
             continue
 
         # Default: treat input as a semantic search query
-        results = collection.query(
-            query_texts=[user_input],
-            n_results=n_results
-        )
+        results = semantic_query(collection, user_input, n_results)
 
         if results['documents'] and results['documents'][0]:
             print(f"\n  Top {len(results['documents'][0])} results for '{user_input}':\n")
+            # Lines containing any query term, case-insensitively
+            terms_re = re.compile(
+                r'^.*(?:' + '|'.join(map(re.escape, user_input.split())) + r').*$',
+                re.IGNORECASE | re.MULTILINE
+            )
             for i, (doc, metadata, distance) in enumerate(
                 zip(results['documents'][0], results['metadatas'][0], results['distances'][0]), 1
             ):
@@ -321,22 +457,11 @@ def interactive_mode(collection):
                 ports = metadata.get('open_port_count', 0)
                 print(f"  [{i}] {ip} ({hostname}) - {ports} open ports  [score: {distance:.4f}]")
 
-                # Show matching lines from the document
-                lines = doc.split('\n')
-                query_terms = user_input.lower().split()
-                shown = 0
+                # Show matching lines from the document, or else the first service line
+                text = service_text(doc, metadata)
+                lines = matching_lines(terms_re, text, 3) or matching_lines(PORT_LINE_RE, text, 1)
                 for line in lines:
-                    if any(term in line.lower() for term in query_terms):
-                        print(f"      {line.strip()}")
-                        shown += 1
-                        if shown >= 3:
-                            break
-                # If no specific matches found, show first service line
-                if shown == 0:
-                    for line in lines:
-                        if '/' in line and ':' in line:
-                            print(f"      {line.strip()}")
-                            break
+                    print(f"      {line}")
             print()
         else:
             print(f"  No results found for '{user_input}'")
@@ -352,8 +477,16 @@ def main():
         action="store_true",
         help="Launch interactive query mode"
     )
+    parser.add_argument(
+        "--embed-cache",
+        metavar="PATH",
+        help="SQLite file that keeps query embeddings between runs"
+    )
     args = parser.parse_args()
 
+    if args.embed_cache:
+        load_query_cache(args.embed_cache)
+
     print("\n" + "="*70)
     print("ChromaDB Query Examples - Nmap Data")
     print("="*70)
@@ -374,7 +507,11 @@ def main():
             host=chromadb_host,
             port=chromadb_port,
             # Include token if authentication is enabled
-            headers={"Authorization": "Bearer my-secret-token"}
+            headers={"Authorization": "Bearer my-secret-token"},
+            settings=Settings(
+                chroma_http_max_connections=HTTP_MAX_CONNECTIONS,
+                chroma_http_max_keepalive_connections=HTTP_MAX_CONNECTIONS
+            )
         )
 
 
@@ -409,6 +546,9 @@ def main():
         print("  1. Installed ChromaDB: pip install chromadb")
         print("  2. Run query-nmap-chromadb-MiniLM-L6.py first to import your data")
         print()
+    finally:
+        if args.embed_cache:
+            save_query_cache(args.embed_cache)
 
 
 if __name__ == "__main__":
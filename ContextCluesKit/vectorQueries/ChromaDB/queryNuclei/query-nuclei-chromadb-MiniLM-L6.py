@@ -12,6 +12,10 @@ Prerequisites:
 import argparse
 import os
 import chromadb
+from chromadb.config import Settings
+
+# Keep-alive connections ChromaDB's pooled httpx client may hold open
+HTTP_MAX_CONNECTIONS = 4
 
 
 # =========================
@@ -206,7 +210,11 @@ def main():
     client = chromadb.HttpClient(
         host=os.getenv("CHROMADB_HOST", "localhost"),
         port=int(os.getenv("CHROMADB_PORT", "9000")),
-        headers={"Authorization": "Bearer my-secret-token"}
+        headers={"Authorization": "Bearer my-secret-token"},
+        settings=Settings(
+            chroma_http_max_connections=HTTP_MAX_CONNECTIONS,
+            chroma_http_max_keepalive_connections=HTTP_MAX_CONNECTIONS
+        )
     )
 
     collection = client.get_collection("nuclei-import")